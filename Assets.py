@@ -0,0 +1,123 @@
+import threading
+import pygame
+
+
+class Assets:
+    """
+    Registry of images: each one is decoded, converted to the display format and scaled only once
+    """
+    screen_size = (800, 800)
+    screens = ["screen000.png", "screen001.png", "screen002.png", "screen003.png"]   # FULL-SCREEN IMAGES
+    icons = ["icon00.png", "icon01.png", "icon10.png", "icon20.png"]                 # SPRITES (with transparency)
+
+    images = {}                 # (name, size) -> Surface
+    lock = threading.Lock()     # guards images (the cache may be filled by a background thread)
+
+    # MAIN METHODS #
+
+    def get_image(name, size=None):  # static
+        """
+        Gets an image from the cache, loading it first if needed
+        :param name: file name
+        :param size: (width, height) to scale to; None to keep the original size
+        :return: Surface
+        """
+        key = (name, size)
+        with Assets.lock:
+            image = Assets.images.get(key)
+            if image is None:
+                image = Assets.load(name, size)
+                Assets.images[key] = image
+        return image
+
+    def get_screen(name):  # static
+        """
+        :return: full-screen image, pre-scaled to the screen size
+        """
+        return Assets.get_image(name, Assets.screen_size)
+
+    def preload(background=False):  # static
+        """
+        Loads every screen and icon into the cache
+        :param background: True to fill the cache in a background thread (images that are requested before the
+                           thread gets to them are loaded on demand instead)
+        :return: Thread object if background is True; None otherwise
+        """
+        if not background:
+            Assets.preload_all()
+            return None
+        thread = threading.Thread(target=Assets.preload_all, daemon=True)
+        thread.start()
+        return thread
+
+    # HELPER METHODS #
+
+    def preload_all():  # static
+        for name in Assets.screens:
+            Assets.get_screen(name)
+        for name in Assets.icons:
+            Assets.get_image(name)
+
+    def load(name, size=None):  # static
+        """
+        Decodes an image file, converts it to the display's pixel format (if a display exists) and scales it
+        :return: Surface
+        """
+        image = pygame.image.load(name)
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+        if size is not None and image.get_size() != size:
+            image = pygame.transform.scale(image, size)
+        return image
+
+
+class Sounds:
+    """
+    Sound bank: effects are decoded once and played on reserved mixer channels (never blocks the game loop)
+    """
+    names = ["sfx_bad.mp3", "sfx_good.mp3", "sfx_win.mp3"]
+    volume = 0.6
+
+    sounds = {}         # name -> Sound
+    channels = []       # reserved Channel objects
+    next_channel = 0    # channel to cut off when all of them are busy (round-robin)
+
+    # MAIN METHODS #
+
+    def load_all(channel_count=4):  # static
+        """
+        Decodes every sound effect and reserves mixer channels for them (call after pygame.mixer.init)
+        :param channel_count: number of effects that can overlap without cutting each other off
+        """
+        if pygame.mixer.get_num_channels() < channel_count:
+            pygame.mixer.set_num_channels(channel_count)
+        pygame.mixer.set_reserved(channel_count)
+        Sounds.channels = [pygame.mixer.Channel(i) for i in range(channel_count)]
+        for name in Sounds.names:
+            Sounds.get_sound(name)
+
+    def play(name):  # static
+        """
+        Plays a sound effect on a free reserved channel (returns immediately)
+        :param name: file name
+        """
+        sound = Sounds.get_sound(name)
+        if not Sounds.channels:     # load_all was not called - let the mixer pick any channel
+            sound.play()
+            return
+        for channel in Sounds.channels:
+            if not channel.get_busy():
+                channel.play(sound)
+                return
+        Sounds.channels[Sounds.next_channel].play(sound)   # ALL BUSY: cut one off (round-robin)
+        Sounds.next_channel = (Sounds.next_channel + 1) % len(Sounds.channels)
+
+    # HELPER METHODS #
+
+    def get_sound(name):  # static
+        sound = Sounds.sounds.get(name)
+        if sound is None:
+            sound = pygame.mixer.Sound(name)
+            sound.set_volume(Sounds.volume)
+            Sounds.sounds[name] = sound
+        return sound
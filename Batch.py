@@ -0,0 +1,164 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+import numpy as np
+from Game import GameState
+from Player import Player
+
+SETTINGS = {"player_speed": 240,    # PIXELS PER SECOND (see Player)
+            "qix_speed": 120,       # PIXELS PER SECOND (see Qix)
+            "sparx_speed": 120,     # PIXELS PER SECOND (see Sparx)
+            "epsilon": 25,          # COLLISION DISTANCE IN PIXELS (see Player.collision_epsilon)
+            "win_score": 75,        # % OF THE SCREEN TO CLAIM TO FINISH A LEVEL
+            "max_ticks": 60000}     # GAMES STILL RUNNING AFTER THIS MANY TICKS ARE STOPPED (8+ minutes of game time)
+
+
+class ScriptedPlayer:
+    """
+    Stand-in for a human: presses a random arrow key every change_every ticks on average
+    """
+    MOVES = (Player.UP, Player.DOWN, Player.LEFT, Player.RIGHT)
+
+    def __init__(self, seed, change_every=40):
+        """
+        :param seed: seed of the game to play (the script draws from its own stream, see get_script_seed)
+        :param change_every: average ticks between two key presses
+        """
+        self.rng = random.Random(ScriptedPlayer.get_script_seed(seed))
+        self.change_every = change_every
+
+    def get_script_seed(seed):  # static
+        """
+        Derives the seed of the script from the seed of the game, such that the key presses are independent of the
+        game's random numbers (random.Random(seed + 1) would replay the stream of the game with the next seed)
+        :return: integer
+        """
+        return int(np.random.SeedSequence(seed).spawn(1)[0].generate_state(1)[0])
+
+    def get_inputs(self, state):
+        """
+        :param state: GameState object (unused: the script does not look at the game)
+        :return: list of actions for the next tick
+        """
+        if self.rng.randrange(self.change_every) == 0:
+            return [self.rng.choice(ScriptedPlayer.MOVES)]
+        return []
+
+# =========
+#   GAMES
+# =========
+
+def make_game(seed, settings):
+    """
+    :param settings: dict like SETTINGS
+    :return: GameState object with the given settings applied
+    """
+    state = GameState(seed=seed)
+    state.player.speed = settings["player_speed"]
+    state.player.collision_epsilon = settings["epsilon"]
+    state.qix.speed = settings["qix_speed"]
+    state.sparx.speed = settings["sparx_speed"]
+    state.win_score = settings["win_score"]
+    return state
+
+def run_game(job):
+    """
+    Plays one headless game with a scripted player
+    :param job: (seed, settings) tuple - the seed decides the game and the script
+    :return: dict of per-game stats
+    """
+    seed, settings = job
+    state = make_game(seed, settings)
+    script = ScriptedPlayer(seed)
+    captures = 0
+    version = state.border.version
+    while state.ticks < settings["max_ticks"] and not state.is_over():
+        events = state.step(script.get_inputs(state))
+        if state.border.version != version:
+            version = state.border.version
+            if GameState.LEVEL_UP not in events:    # (level up resets the board)
+                captures += 1
+    return {"seed": seed, "ticks": state.ticks, "captures": captures, "lives_lost": 3 - state.player.lives,
+            "score": state.border.get_score_value(), "level": state.level, "won": state.won}
+
+def run_batch(games, settings=None, first_seed=0, processes=None):
+    """
+    Plays independent games in a process pool (one seed per game: first_seed, first_seed + 1, ...)
+    :param settings: dict of SETTINGS to change (the rest keep their defaults)
+    :param processes: number of worker processes; None = one per CPU
+    :return: list of per-game stats (ordered by seed)
+    """
+    settings = dict(SETTINGS, **(settings or {}))
+    jobs = [(seed, settings) for seed in range(first_seed, first_seed + games)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        return [run_game(job) for job in jobs]
+    with Pool(processes) as pool:
+        results = list(pool.imap_unordered(run_game, jobs, chunksize=max(1, games // (processes * 8))))
+    return sorted(results, key=lambda result: result["seed"])
+
+def summarize(results):
+    """
+    Combines per-game stats
+    :return: dict of totals, means and rates
+    """
+    count = len(results)
+    ticks = sorted(result["ticks"] for result in results)
+    return {"games": count,
+            "total_ticks": sum(ticks),
+            "mean_ticks": round(sum(ticks) / count, 1) if count else 0,
+            "median_ticks": ticks[count // 2] if count else 0,
+            "mean_captures": round(sum(result["captures"] for result in results) / count, 2) if count else 0,
+            "mean_lives_lost": round(sum(result["lives_lost"] for result in results) / count, 3) if count else 0,
+            "mean_score": round(sum(result["score"] for result in results) / count, 2) if count else 0,
+            "win_rate": round(sum(result["won"] for result in results) / count, 4) if count else 0,
+            "level2_rate": round(sum(result["level"] == 2 for result in results) / count, 4) if count else 0}
+
+# ==========
+#   SWEEPS
+# ==========
+
+def get_sweep(args):
+    """
+    :return: list of settings dicts - every combination of the comma-separated values given on the command line
+    :raise ValueError: if a setting is given the same value twice (the sweep would play the same games twice)
+    """
+    names = [name for name in SETTINGS if getattr(args, name) is not None]
+    values = [[int(value) for value in getattr(args, name).split(",")] for name in names]
+    for name, sweep in zip(names, values):
+        if len(set(sweep)) < len(sweep):
+            raise ValueError("--%s values %s repeat a value" % (name.replace("_", "-"), getattr(args, name)))
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays many headless games with a scripted player (in parallel)")
+    parser.add_argument("--games", type=int, default=1000, help="games per setting")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write every summary (and per-game stats) to this JSON file")
+    for name, default in SETTINGS.items():
+        parser.add_argument("--" + name.replace("_", "-"), dest=name,
+                            help="value(s) to sweep, comma-separated (default %s)" % default)
+    args = parser.parse_args()
+
+    try:
+        sweep = get_sweep(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+    report = []
+    for settings in sweep:
+        start = time.perf_counter()
+        results = run_batch(args.games, settings, args.seed, args.processes)
+        seconds = time.perf_counter() - start
+        summary = summarize(results)
+        summary["ticks_per_second"] = round(summary["total_ticks"] / seconds)
+        print(json.dumps(dict(settings, **summary)))
+        report.append({"settings": dict(SETTINGS, **settings), "summary": summary, "games": results})
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
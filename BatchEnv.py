@@ -0,0 +1,326 @@
+import argparse
+import time
+import numpy as np
+from Batch import SETTINGS, ScriptedPlayer
+from Border import Border
+from Game import GameState
+from Line import Trail
+from Player import Player
+from Raster import Raster
+
+
+class BatchEnv:
+    """
+    Many level 1 games stepped together (ex. to train agents): positions, directions, lives and trails are NumPy arrays
+    with one row per game, and point queries are lookups into one stack of occupancy masks (see Raster) - only
+    captures and collisions go through the per-game Border/Trail objects.
+    Rules are GameState's, except: no Sparx (a game ends when level 1 is won), no teleport, and the player cannot walk
+    back over their own trail (GameState backtracks it).
+    """
+    ACTIONS = (None, Player.UP, Player.DOWN, Player.LEFT, Player.RIGHT, Player.STOP)    # ACTION INDEX -> Player action
+    DX = np.array([0, 0, 0, -1, 1, 0], dtype=np.int32)     # ACTION INDEX -> DIRECTION (index 0 keeps the direction)
+    DY = np.array([0, -1, 1, 0, 0, 0], dtype=np.int32)
+    TRAIL = 3       # MASK VALUE OF A TRAIL PIXEL (next to the Raster values; Border's own raster never holds a trail)
+
+    def __init__(self, count, seed=None, settings=None, stride=10):
+        """
+        :param count: number of games
+        :param seed: seed of the Qix positions and targets
+        :param settings: dict of Batch.SETTINGS to change (sparx_speed is unused; the other speeds must be whole pixels
+                         per tick)
+        :param stride: pixels between two samples of the occupancy grid in the observations
+        """
+        settings = dict(SETTINGS, **(settings or {}))
+        self.count = count
+        self.rng = np.random.default_rng(seed)
+        self.stride = stride
+        for name in ("player_speed", "qix_speed"):
+            if settings[name] % GameState.TICK_RATE != 0:   # (the masks are stepped a whole pixel at a time)
+                raise ValueError("%s must be a whole number of pixels per tick (a multiple of %d)"
+                                 % (name, GameState.TICK_RATE))
+        self.player_speed = settings["player_speed"] // GameState.TICK_RATE  # PIXELS PER TICK
+        self.qix_speed = settings["qix_speed"] // GameState.TICK_RATE
+        self.epsilon = settings["epsilon"]
+        self.win_score = settings["win_score"]
+        self.max_ticks = settings["max_ticks"]
+        self.hit_ticks = round(0.3 * GameState.TICK_RATE)     # FREEZE AFTER A DIRECT HIT (see Player.check_collisions)
+
+        self.template = Border(raster=True)     # FRESH BOARD - ITS MASK AND GEOMETRY ARE SHARED BY EVERY NEW GAME
+        self.template.validate_geometry()
+        self.left, self.top = self.template.left, self.template.top
+        self.right, self.bottom = self.template.right, self.template.bottom
+        self.pad = 1                            # CLAIMED PIXELS AROUND EACH MASK (a pixel off the grid stays inside)
+        height, width = self.template.raster.mask.shape
+        self.template_mask = np.zeros((height + 2 * self.pad, width + 2 * self.pad), dtype=np.uint8)
+        self.template_mask[self.pad:-self.pad, self.pad:-self.pad] = self.template.raster.mask
+        self.masks = np.zeros((count,) + self.template_mask.shape, dtype=np.uint8)  # ONE MASK PER GAME
+        self.template_grid = self.template.raster.mask[::stride, ::stride].copy()
+        self.grids = np.zeros((count,) + self.template_grid.shape, dtype=np.uint8)  # DOWNSAMPLED masks (observations)
+        self.borders = [None] * count
+        self.indexes = np.arange(count)
+
+        player = Player()
+        self.start = player.x, player.y
+        self.x = np.full(count, player.x, dtype=np.int32)     # PLAYERS
+        self.y = np.full(count, player.y, dtype=np.int32)
+        self.dx = np.zeros(count, dtype=np.int32)
+        self.dy = np.zeros(count, dtype=np.int32)
+        self.lives = np.full(count, player.lives, dtype=np.int32)
+        self.trails = np.zeros((count, 16, 2), dtype=np.int32)     # TRAIL POINTS (grown as needed)
+        self.trail_lengths = np.zeros(count, dtype=np.int32)      # 0 = NOT DRAWING A TRAIL
+
+        self.qix_x = np.zeros(count, dtype=np.int32)        # QIXES
+        self.qix_y = np.zeros(count, dtype=np.int32)
+        self.target_x = np.zeros(count, dtype=np.int32)
+        self.target_y = np.zeros(count, dtype=np.int32)
+
+        self.freeze = np.zeros(count, dtype=np.int32)       # TICKS LEFT OF THE FREEZE AFTER A COLLISION
+        self.scores = np.zeros(count, dtype=np.int32)       # Border.get_score_value() OF EVERY GAME
+        self.ticks = np.zeros(count, dtype=np.int64)        # TICKS SINCE EACH GAME STARTED
+
+    # MAIN METHODS #
+
+    def reset(self):
+        """
+        Starts a new game everywhere
+        :return: observations (see get_observations)
+        """
+        self.reset_games(self.indexes)
+        return self.get_observations()
+
+    def step(self, actions):
+        """
+        Advances every game by one tick; games that end are started again right away
+        :param actions: integer array of shape (count,) - indexes into BatchEnv.ACTIONS
+        :return: (observations, rewards, dones, infos): rewards = change of the score (% of the grid) this tick,
+                 dones = games that ended (their observations are of the new game), infos = dict of arrays
+                 ("won", and "ticks" = length of the games that ended)
+        """
+        rewards = np.zeros(self.count, dtype=np.float32)
+        self.apply_actions(np.asarray(actions))
+        self.ticks += 1
+        active = self.freeze == 0
+        self.freeze[~active] -= 1
+
+        self.move_players(active, rewards)
+        self.move_qixes(active)
+        self.check_collisions(active)
+
+        won = self.scores > self.win_score
+        dones = won | (self.lives <= 0) | (self.ticks >= self.max_ticks)
+        infos = {"won": won, "ticks": np.where(dones, self.ticks, 0)}
+        if dones.any():
+            self.reset_games(np.flatnonzero(dones))
+        return self.get_observations(), rewards, dones, infos
+
+    def get_observations(self):
+        """
+        :return: (grids, entities): uint8 array of shape (count, rows, columns) - every stride-th pixel of the masks
+                 (Raster pixel values), and int32 array of shape (count, 4) - player x, y and Qix x, y
+        """
+        return self.grids.copy(), np.stack((self.x, self.y, self.qix_x, self.qix_y), axis=1)
+
+    # STEP HELPERS #
+
+    def apply_actions(self, actions):
+        """
+        Changes directions; a new direction while drawing adds a trail point where the player is (as
+        Player.change_left etc., but for reversals too: the trail must follow the player back to the edge)
+        """
+        pressed = actions != 0
+        dx = np.where(pressed, BatchEnv.DX[actions], self.dx)
+        dy = np.where(pressed, BatchEnv.DY[actions], self.dy)
+        lengths = self.trail_lengths
+        last = self.trails[self.indexes, np.maximum(lengths - 1, 0)]
+        turned = np.flatnonzero((lengths > 0) & ((dx != self.dx) | (dy != self.dy)) & ((dx != 0) | (dy != 0)) &
+                                ((last[:, 0] != self.x) | (last[:, 1] != self.y)))
+        if len(turned):
+            self.add_trail_points(turned)
+        self.dx, self.dy = dx, dy
+
+    def move_players(self, active, rewards):
+        """
+        Moves the players one pixel at a time (as Player.get_step_end): a step stops before the first pixel that is
+        not field or edge (claimed, or the player's own trail); leaving the edges starts a trail, and reaching them
+        again ends the step with a capture
+        """
+        walking = np.flatnonzero(active & ((self.dx != 0) | (self.dy != 0)))
+        for _ in range(self.player_speed):
+            if len(walking) == 0:
+                break
+            x, y = self.x[walking] + self.dx[walking], self.y[walking] + self.dy[walking]
+            values = self.masks[walking, y - self.top + self.pad, x - self.left + self.pad]
+            field = values == Raster.FIELD
+            closing = (values == Raster.EDGE) & (self.trail_lengths[walking] > 0)
+            started = walking[field & (self.trail_lengths[walking] == 0)]  # THE TRAIL STARTS WHERE THE PLAYER WAS
+            if len(started):
+                self.add_trail_points(started)
+            self.set_pixels(walking[field], x[field], y[field], BatchEnv.TRAIL)    # EVERY PIXEL MOVED OVER BECOMES TRAIL
+            moved = field | (values == Raster.EDGE)
+            self.x[walking[moved]], self.y[walking[moved]] = x[moved], y[moved]
+            for i in walking[closing]:
+                self.capture(i, rewards)
+            walking = walking[moved & ~closing]
+
+    def move_qixes(self, active):
+        """
+        Moves every Qix toward its target; picks a new target once reached or claimed (as Qix.update)
+        """
+        lost = self.masks[self.indexes, self.target_y - self.top + self.pad,
+                          self.target_x - self.left + self.pad] == Raster.CLAIMED
+        retarget = np.flatnonzero(active & (((self.qix_x == self.target_x) & (self.qix_y == self.target_y)) | lost))
+        if len(retarget):
+            self.target_x[retarget], self.target_y[retarget] = self.get_valid_positions(retarget)
+        step = self.qix_speed * active
+        self.qix_x += np.clip(self.target_x - self.qix_x, -step, step)
+        self.qix_y += np.clip(self.target_y - self.qix_y, -step, step)
+
+    def check_collisions(self, active):
+        """
+        Qix on the trail (including the line in progress): the player goes back to the start of the trail;
+        Qix on the player: the player also loses a life, the game freezes and the Qix teleports (as Player.check_collisions)
+        """
+        epsilon = self.epsilon
+        trail_hit = np.zeros(self.count, dtype=bool)
+        drawing = np.flatnonzero(active & (self.trail_lengths > 0))
+        if len(drawing):
+            lengths = self.trail_lengths[drawing]
+            starts = self.trails[drawing, :lengths.max()]
+            ends = np.empty_like(starts)
+            ends[:, :-1] = starts[:, 1:]
+            ends[np.arange(len(drawing)), lengths - 1] = np.stack((self.x[drawing], self.y[drawing]), axis=1)
+            qix_x, qix_y = self.qix_x[drawing, None], self.qix_y[drawing, None]
+            near = ((np.minimum(starts[..., 0], ends[..., 0]) <= qix_x) &    # EXACT (as Player.check_trail_collision)
+                    (qix_x <= np.maximum(starts[..., 0], ends[..., 0])) &
+                    (np.minimum(starts[..., 1], ends[..., 1]) <= qix_y) &
+                    (qix_y <= np.maximum(starts[..., 1], ends[..., 1])) &
+                    (np.arange(starts.shape[1]) < lengths[:, None]))
+            trail_hit[drawing] = near.any(axis=1)
+        direct_hit = (active & ~trail_hit & (np.abs(self.qix_x - self.x) <= epsilon) &
+                      (np.abs(self.qix_y - self.y) <= epsilon))
+
+        for i in np.flatnonzero(trail_hit | direct_hit):
+            if self.trail_lengths[i] > 0:
+                start = self.trails[i, 0].copy()
+                self.clear_trail(i, (int(self.x[i]), int(self.y[i])), Raster.FIELD)
+                self.x[i], self.y[i] = start
+        hit = np.flatnonzero(direct_hit)
+        if len(hit):
+            self.lives[hit] -= 1
+            self.freeze[hit] = self.hit_ticks
+            self.qix_x[hit], self.qix_y[hit] = self.get_valid_positions(hit)
+            self.target_x[hit], self.target_y[hit] = self.qix_x[hit], self.qix_y[hit]
+
+    # PER-GAME HELPERS #
+
+    def reset_games(self, indexes):
+        """
+        Starts new games: copies the template mask and shares the template geometry instead of rebuilding them
+        """
+        self.masks[indexes] = self.template_mask
+        self.grids[indexes] = self.template_grid
+        for i in indexes:
+            border = Border()
+            border.raster = Raster(border.left, border.top, border.right, border.bottom,
+                                   self.masks[i, self.pad:-self.pad, self.pad:-self.pad])
+            border.raster.is_exact = True
+            border.share_geometry(self.template)
+            self.borders[i] = border
+
+        self.x[indexes], self.y[indexes] = self.start
+        self.dx[indexes] = self.dy[indexes] = 0
+        self.lives[indexes] = Player().lives
+        self.trail_lengths[indexes] = 0
+        self.qix_x[indexes] = self.target_x[indexes] = self.rng.integers(self.left, self.right, len(indexes))
+        self.qix_y[indexes] = self.target_y[indexes] = self.rng.integers(self.top, self.bottom, len(indexes))
+        self.freeze[indexes] = self.scores[indexes] = self.ticks[indexes] = 0
+
+    def capture(self, i, rewards):
+        """
+        Adds the trail of game i (which just reached the edges) to its border - the part with the Qix stays
+        """
+        trail = Trail()
+        for point in self.trails[i, :self.trail_lengths[i]].tolist():
+            trail.add_endpoint(tuple(point))
+        end = int(self.x[i]), int(self.y[i])
+        border = self.borders[i]
+        if border.add_poly(trail, end, (int(self.qix_x[i]), int(self.qix_y[i]))):
+            self.trail_lengths[i] = 0
+            self.grids[i] = self.masks[i, self.pad:-self.pad:self.stride, self.pad:-self.pad:self.stride]
+        else:
+            self.clear_trail(i, end, Raster.EDGE)
+        score = border.get_score_value()
+        rewards[i] += score - self.scores[i]
+        self.scores[i] = score
+
+    def clear_trail(self, i, end, end_value):
+        """
+        Turns the trail pixels of game i back into field (its first point back into edge)
+        :param end: tuple where the trail ends (ex. the player's position)
+        :param end_value: pixel value to leave at end
+        """
+        raster = self.borders[i].raster
+        points = [tuple(point) for point in self.trails[i, :self.trail_lengths[i]].tolist()] + [end]
+        for k in range(1, len(points)):
+            raster.draw_line(points[k - 1], points[k], Raster.FIELD)
+        raster.draw_line(points[0], points[0], Raster.EDGE)
+        raster.draw_line(end, end, end_value)
+        self.trail_lengths[i] = 0
+        self.grids[i] = self.masks[i, self.pad:-self.pad:self.stride, self.pad:-self.pad:self.stride]
+
+    def add_trail_points(self, indexes):
+        """
+        Appends the players' positions to their trails
+        """
+        lengths = self.trail_lengths[indexes]
+        if lengths.max() >= self.trails.shape[1]:
+            self.trails = np.concatenate((self.trails, np.zeros_like(self.trails)), axis=1)
+        self.trails[indexes, lengths] = np.stack((self.x[indexes], self.y[indexes]), axis=1)
+        self.trail_lengths[indexes] = lengths + 1
+
+    def set_pixels(self, indexes, xs, ys, value):
+        """
+        Sets one pixel per given game in the masks (and in the grids, where the pixel is sampled)
+        """
+        self.masks[indexes, ys - self.top + self.pad, xs - self.left + self.pad] = value
+        sampled = ((xs - self.left) % self.stride == 0) & ((ys - self.top) % self.stride == 0)
+        self.grids[indexes[sampled], (ys[sampled] - self.top) // self.stride,
+                   (xs[sampled] - self.left) // self.stride] = value
+
+    def get_valid_positions(self, indexes):
+        """
+        Draws a random field or edge pixel for each given game (rejection sampling, all games at once)
+        :return: (x array, y array)
+        """
+        xs = np.zeros(len(indexes), dtype=np.int32)
+        ys = np.zeros(len(indexes), dtype=np.int32)
+        pending = np.arange(len(indexes))
+        while len(pending):
+            x = self.rng.integers(self.left, self.right + 1, len(pending))
+            y = self.rng.integers(self.top, self.bottom + 1, len(pending))
+            valid = self.masks[indexes[pending], y - self.top + self.pad, x - self.left + self.pad] != Raster.CLAIMED
+            xs[pending[valid]], ys[pending[valid]] = x[valid], y[valid]
+            pending = pending[~valid]
+        return xs, ys
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures BatchEnv throughput with random players")
+    parser.add_argument("--count", type=int, default=1024, help="games stepped together")
+    parser.add_argument("--steps", type=int, default=2000, help="steps of the whole batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = BatchEnv(args.count, args.seed)
+    env.reset()
+    keys = np.random.default_rng(ScriptedPlayer.get_script_seed(args.seed))  # (independent of the Qix stream)
+    dones = total = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = np.where(keys.random(args.count) < 1 / 40, keys.integers(1, 5, args.count), 0)   # (as ScriptedPlayer)
+        observations, rewards, done, infos = env.step(actions)
+        dones += done.sum()
+        total += rewards.sum()
+    seconds = time.perf_counter() - start
+    print("%d games x %d steps in %.2f s: %.0f steps/s, %d games ended, %.1f %% claimed in total" % (
+        args.count, args.steps, seconds, args.count * args.steps / seconds, dones, total))
@@ -1,37 +1,133 @@
-import pygame
-from copy import deepcopy
-from shapely.geometry import Polygon, Point
-from Line import Trail, Line
-from Graphic import Colour
+from shapely.geometry import Polygon, Point, LineString
+from shapely.ops import split
+from shapely.prepared import prep
+try:
+    from shapely import contains_xy, prepare  # Shapely 2.x: query raw x/y against an in-place prepared geometry
+except ImportError:
+    contains_xy = prepare = None              # Shapely 1.x: fall back to PreparedGeometry + Point
+try:
+    from shapely.errors import GEOSException  # Shapely 2.x: raised when GEOS cannot run an operation (ex. split)
+except ImportError:
+    from shapely.errors import TopologicalError as GEOSException   # Shapely 1.x
+from Line import Line
+from Field import Field
+from Perimeter import Perimeter
+from Segments import SegmentArray
+from Raster import Raster
+from Scanlines import ScanlineIndex
 import random
 
 class Border:
 
-    def __init__(self):
+    def __init__(self, raster=False, rng=None):
+        """
+        :param raster: True to also keep an occupancy bitmap of the grid (O(1) pixel queries; see Raster)
+        :param rng: random.Random object for random positions (seeded for reproducible games); None = module random
+        """
+        self.rng = rng if rng is not None else random
         self.left = 100     # CORNERS
         self.top = 100
         self.right = 700
         self.bottom = 700
 
-        self.init_grid = [(self.left, self.top), (self.right, self.top),
-                          (self.right, self.bottom), (self.left, self.bottom)]  # INITIAL GRID/EDGES - NEVER MODIFIED
-        self.edge_points = deepcopy(self.init_grid)                 # POINTS THAT MAKE THE EDGES - FREQUENTLY MODIFIED
-
-        self.must_reverse_dir = False
+        self.init_grid = ((self.left, self.top), (self.right, self.top),
+                          (self.right, self.bottom), (self.left, self.bottom))  # INITIAL GRID/EDGES - NEVER MODIFIED
+        self.init_gridlines = Border.convert_points_to_lines(self.init_grid)
+        self.edge_points = self.init_grid       # POINTS THAT MAKE THE EDGES - REPLACED (never modified) ON CAPTURE
+        self.edges = self.init_gridlines        # Lines OF edge_points
+
+        self.max_area = Border.get_area(self.init_grid)     # AREA OF THE WHOLE GRID
+        self.field_area = self.max_area                     # AREA OF edge_points - UPDATED WITH edge_points
+
+        self.version = 0                # BUMPED WHENEVER edge_points CHANGES - KEYS ALL CACHED GEOMETRY
+        self.geometry_version = -1      # VERSION THAT THE CACHED GEOMETRY BELOW WAS BUILT FOR
+        self.field_polygon = None       # Polygon of edge_points
+        self.prepared_fields = {}       # buffer_amt -> prepared (buffered) field polygon
+        self.field = None               # Field object (rectangle decomposition, for random positions)
+        self.perimeter = None           # Perimeter object (arc-length table over edge_points, for Sparx)
+        self.segments = None            # SegmentArray of edges (vectorized point queries)
+        self.scanlines = None           # ScanlineIndex of the field (point queries); None if not rectilinear
+
+        self.raster = None              # OPTIONAL Raster of the grid - UPDATED WITH edge_points (not lazily)
+        if raster:
+            self.raster = Raster(self.left, self.top, self.right, self.bottom)
+            self.raster.build(self.edge_points)
 
     # ACCESSORS #
 
+    # (points and Lines are immutable, so the accessors share them instead of copying)
+
     def get_edge_points(self):
-        return deepcopy(self.edge_points)
+        return self.edge_points
 
     def get_edges(self):
-        return Border.convert_points_to_lines(self.get_edge_points())
+        return self.edges
 
     def get_init_grid(self):
-        return deepcopy(self.init_grid)
+        return self.init_grid
 
     def get_init_gridlines(self):
-        return Border.convert_points_to_lines(self.get_init_grid())
+        return self.init_gridlines
+
+    def get_field_polygon(self):
+        self.validate_geometry()
+        return self.field_polygon
+
+    def get_field(self):
+        self.validate_geometry()
+        return self.field
+
+    def get_perimeter(self):
+        self.validate_geometry()
+        return self.perimeter
+
+    def get_segments(self):
+        self.validate_geometry()
+        return self.segments
+
+    def get_scanlines(self):
+        self.validate_geometry()
+        return self.scanlines
+
+    # MUTATORS #
+
+    def set_edge_points(self, points, area=None, claimed=None):
+        """
+        Replaces the edge points; every cache keyed on the version is rebuilt lazily on its next use
+        :param points: list of tuples
+        :param area: area of the new field if already known (ex. from a capture); None to calculate it
+        :param claimed: list of point lists removed from the field by a capture (lets the raster update only those);
+                        None to rebuild the raster
+        """
+        self.edge_points = tuple(points)
+        self.edges = Border.convert_points_to_lines(self.edge_points)
+        self.field_area = Border.get_area(points) if area is None else area
+        self.version += 1
+        if self.raster is not None:
+            if claimed is None:
+                self.raster.build(self.edge_points)
+            else:
+                self.raster.claim(self.edge_points, claimed)
+
+    def reset_edges(self):
+        self.set_edge_points(self.init_grid)
+
+    def share_geometry(self, other):
+        """
+        Reuses the cached geometry of another border that has the same edge points (ex. many fresh boards built from
+        one template); safe because the caches are replaced, never modified, on capture
+        :param other: Border object
+        """
+        if other.edge_points != self.edge_points:
+            raise ValueError("borders have different edge points")
+        other.validate_geometry()
+        self.field_polygon = other.field_polygon
+        self.prepared_fields = dict(other.prepared_fields)
+        self.field = other.field
+        self.perimeter = other.perimeter
+        self.segments = other.segments
+        self.scanlines = other.scanlines
+        self.geometry_version = self.version
 
     # MAIN METHODS (public) #
 
@@ -40,13 +136,21 @@ class Border:
         Checks if a given coordinate is in bounds
         :return: True if in bounds / False if out of bounds
         """
-        point = Point(x, y)
-        edges = Polygon(self.get_edge_points())   # Make into Polygon object here
-        return edges.buffer(buffer_amt).contains(point)    # buffer(-1) to account for EDGES!!!!! (not "contained")
+        if self.raster is not None and self.raster.is_exact and -1 <= buffer_amt <= 1 and \
+                isinstance(x, int) and isinstance(y, int) and isinstance(buffer_amt, int):
+            return self.raster.is_inside(x, y, buffer_amt)     # one pixel lookup
+        scanlines = self.get_scanlines()
+        if scanlines is not None:
+            return scanlines.is_valid_move(x, y, buffer_amt)    # bisects one row (no Shapely)
+        field = self.get_prepared_field(buffer_amt)    # buffer(-1) to account for EDGES!!!!! (not "contained")
+        if contains_xy is not None:
+            return bool(contains_xy(field, x, y))
+        return field.contains(Point(x, y))
 
-    def add_poly(self, trail, endpoint2):
+    def add_poly(self, trail, endpoint2, keep_point=None):
         """
         Tries to add player's trail to the edges
+        :param keep_point: tuple that must stay in the field (ex. the Qix's position); None to keep the larger part
         :return: True if successfully added / False if unable to add
         """
         if len(trail) < 1:
@@ -58,262 +162,186 @@ class Border:
             trail.empty_trail()
             return False  # cannot add trail
 
-        edges = self.get_fixed_edges(trail)   # Part 2) HELPER: Reorder edges; Make sure it's in the right direction
-        return self.update_edges(trail, edges)  # Part 3) HELPER: Use fixed trail and edges to perform update
-
-    # MAIN HELPER FUNCTIONS #
-
-    def get_fixed_edges(self, trail):
-        """
-        Creates edges that go in the same direction as the trail & whose first line contains the 1st point of the trail
-        :param trail: "fixed" Trail object (as in, it has no invalid lines)
-        :return: "fixed" edges (as in, goes in same direction as tr and has the correct starting edge)
-        """
-        self.must_reverse_dir = True
-        edges = self.get_edges()
-        starting_point = trail.get_first_point()
-
-        if not self.is_same_direction_as_edges(deepcopy(trail)):  # HELPER: Check direction to grab the right area
-            edges = Trail.get_reverse(deepcopy(edges))            # HELPER: Reverse edges with static Trail method
-            self.must_reverse_dir = False
-
-        return Border.get_reordered_edges(deepcopy(edges), starting_point)  # HELPER: Edges must start on starting point
-
-    def update_edges(self, trail, edges):
-        """
-        Updates the edge points so that trail is considered.
-        :param trail: "fixed" Trail object
-        :param edges: list of Line objects ("fixed" edges)
-        :return: True if successful in updating the edge_points instance variable
-        """
-        new_edge_points = self.get_new_edge_points(trail, edges)  # HELPER: appends trail to the right section of edges
+        try:                                  # Part 2) HELPER: Split the field by the trail
+            new_edge_points, area, claimed = self.get_split_edge_points(trail, keep_point)
+        except GEOSException:                 # -----> GEOS could not split the field by this trail: no capture
+            new_edge_points = None
+        trail.empty_trail()
         if new_edge_points is None:
-            trail.empty_trail()
-            return False
-
-        new_edge_lines = Trail()                                  # Make into temp Trail obj to benefit from its methods
-        new_edge_lines.add_endpoints(new_edge_points)             # -> HELPER: removes overlap
-        new_edge_lines.fix_trail()                                # -> HELPER: removes invalid lines (aka points)
-
-        if len(new_edge_lines) < 1:
-            trail.empty_trail()
-            return False
-
-        fixed_new_edge_points = new_edge_lines.get_trail_points()  # -> HELPER: convert Trail obj back into points
-
-        if self.must_reverse_dir:               # REVERSE EDGES
-            fixed_new_edge_points.reverse()
+            return False  # cannot add trail
 
-        self.edge_points = fixed_new_edge_points     # FINALLY: do the update
-        trail.empty_trail()
+        self.set_edge_points(new_edge_points, area, claimed)  # Part 3) FINALLY: do the update
         return True  # success
 
     # HELPER FUNCTIONS #
 
-    def get_new_edge_points(self, trail, edges):
-        """
-        Appends the trail to the appropriate edge (but does so roughly... may result in duplicate points/overlap)
-        :param trail: Trail object
-        :param edges: List of Lines wherein its first Line contains the first point of the trail
-        :return: List of tuples
-        """
-        trail_points = trail.get_trail_points()
-
-        try:
-            p1_edge_index = Border.get_index_of(edges, trail.get_first_point())  # Line whr edges intsct 1st pt of trail
-            p2_edge_index = Border.get_index_of(edges, trail.get_last_point())  # Line whr edges intsct last pt of trail
-            first_edge_points = Border.convert_lines_to_points(edges[0:p1_edge_index+1])  # 1st edge pts -> 1st pt of tr
-            last_edge_points = Border.convert_lines_to_points(edges[p2_edge_index+1:])   # Last pt of tr -> Last edg pts
-
-            new_edge_points = first_edge_points + trail_points + last_edge_points  # Concatenate points
-            return new_edge_points
-
-        except:
-            return None  # ex. if unable to identify the index of first or last point of the trail
-
-    def is_same_direction_as_edges(self, trail):
-        """
-        Checks that the direction of the trail (from firstpt1 to lastpt) matches the direction of the edges
-        :param trail: Trail object
-        :return: False if the path from lastpt to firstpt is shorter and thus trail is in a different direction
-        """
-        first_point = trail.get_first_point()
-        last_point = trail.get_last_point()
-
-        try:
-            first_to_last = self.get_distance_between(first_point, last_point)  # HELPER: Number of turns between 2 points
-            last_to_first = self.get_distance_between(last_point, first_point)
-            if first_to_last == last_to_first:
-                return trail.compare_POIs(self.get_edges(), first_point, last_point)
-            return first_to_last <= last_to_first  # Assume that edges are going in the direction with the least turns
-
-        except:
-            return None  # ex. Either first_to_last or last_to_first returned None and thus cannot be compared with <=
-
-    def get_distance_between(self, point1, point2): #MODIFIED TO RETURN DISTANCE
-        """
-        Calculates the distance between two given points when traversing edges
-        :param point1: tuple
-        :param point2: tuple
-        :return: integer
-        """
-        edges = Border.get_reordered_edges(self.get_edges(), point1)  # Reorder edges st POINT 1 IS AT INDEX 0
-
-        try:
-            index_2 = Border.get_index_of(edges, point2)              # POINT 2 IS AT INDEX index_2
-
-            if index_2 == 0:  # CASE A: points are on the same edge
-                modified_first_edge = Line(point1, point2)
-                distance = modified_first_edge.get_distance()
-                return distance
-
-            # CASE B: points are on different edges
-            modified_first_edge = Line(point1, edges[0].endpoint2)          # make modified edges
-            modified_last_edge = Line(edges[index_2].endpoint1, point2)
-
-            modified_edges = Trail()  # make into trail (bc we have a function to calc distance)
-            modified_edges.lines = [modified_first_edge] + edges[1:index_2] + [modified_last_edge] #   get disance
-            distance = modified_edges.get_distance()
-            return distance                                          # = NUMBER OF LINES BTWN PT 1 AND 2; (+1 bc idx 0)
-
-        except:  # index error, value error
-            return None  # ex. If it is unable to find point2 for some reason and thus cannot do index2+1
+    def validate_geometry(self):
+        """
+        Rebuilds the cached field polygon (and drops its buffered variants) if edge_points changed since the last build
+        """
+        if self.geometry_version != self.version:
+            self.field_polygon = Polygon(self.edge_points)
+            self.prepared_fields = {}
+            self.field = Field(self.edge_points, self.left, self.right)
+            self.perimeter = Perimeter(self.edge_points)
+            self.segments = SegmentArray(self.edges)
+            self.scanlines = ScanlineIndex(self.edge_points, self.field) if self.field.is_rectilinear else None
+            self.geometry_version = self.version
+
+    def get_prepared_field(self, buffer_amt=1):
+        """
+        Gets the field polygon buffered by buffer_amt, prepared for fast point queries (cached until the next capture)
+        :return: prepared geometry
+        """
+        self.validate_geometry()
+        field = self.prepared_fields.get(buffer_amt)
+        if field is None:
+            field = self.field_polygon.buffer(buffer_amt)
+            if prepare is not None:
+                prepare(field)
+            else:
+                field = prep(field)
+            self.prepared_fields[buffer_amt] = field
+        return field
+
+    # CAPTURE HELPERS #
+
+    def get_split_edge_points(self, trail, keep_point=None):
+        """
+        Splits the field polygon by the trail (one geometric operation) and keeps the part that contains keep_point, or
+        the larger part if keep_point is None (or not strictly inside any part)
+        :param trail: "fixed" Trail object (its ends are on the edges)
+        :param keep_point: tuple
+        :return: (List of integer tuples with the same orientation as the current edge points, new field area,
+                  list of point lists that were removed); (None, None, None) if the trail does not enclose any area
+        """
+        parts = [part for part in split(self.get_field_polygon(), LineString(trail.get_trail_points())).geoms
+                 if part.area > 0]
+        if len(parts) < 2:
+            return None, None, None
+
+        kept = max(parts, key=lambda part: part.area)
+        if keep_point is not None:
+            for part in parts:
+                if part.contains(Point(keep_point)):
+                    kept = part
+                    break
+
+        new_edge_points = Border.get_simplified_points([(round(x), round(y)) for x, y in kept.exterior.coords[:-1]])
+        if (Border.get_signed_area(new_edge_points) > 0) != (Border.get_signed_area(self.edge_points) > 0):
+            new_edge_points.reverse()   # Keep the direction of the edges (ex. Sparx keep going the same way)
+        removed = [part for part in parts if part is not kept]
+        claimed = [[(round(x), round(y)) for x, y in part.exterior.coords[:-1]] for part in removed]
+        return new_edge_points, self.field_area - sum(part.area for part in removed), claimed
 
     # POSITION GENERATORS + HELPERS #
 
-    def get_valid_position(self, step=1):
+    def get_valid_position(self, step=1, rng=None):
         """
         Generates a RANDOM valid coordinate for a Player/enemy object (ex. for teleportation)
+        :param rng: random.Random object to draw from; None = the border's
         :return: Tuple
         """
-        random_x = random.randrange(100, 700, step)
-        random_y = random.randrange(100, 700, step)
-        while not self.is_valid_move(random_x, random_y):
-            random_x = random.randrange(100, 700, step)  # any number
-            random_y = random.randrange(100, 700, step)  # any number
-        return random_x, random_y
+        rng = rng if rng is not None else self.rng
+        position = self.get_field().sample(step, rng)  # HELPER: area-weighted rectangle -> uniform point inside
+        if position is not None:
+            return position
+        return self.get_valid_position_by_rejection(step, rng)
 
-    def get_next_sparx_position(self, curr_x, curr_y):
+    def get_valid_position_by_rejection(self, step=1, rng=None):
         """
-        Finds the NEXT valid coordinate that a Sparc will move to (ex. traverses along the edges in a CW direction)
-        :param curr_x: x position of the Sparc
-        :param curr_y: y position of the Sparc
+        Generates a RANDOM valid coordinate by drawing from the whole grid until one is in bounds (slow when the
+        field is small; only used if the field cannot be split into rectangles)
         :return: Tuple
         """
-        for edge in Border.get_reordered_edges(self.get_edges(), (curr_x, curr_y)):
-            if edge.contains((curr_x, curr_y)):
-                x = edge.get_next_x(curr_x)
-                y = edge.get_next_y(curr_y)
-                if x is None or y is None: #next point is invalid
-                    pass
-                else:
-                    return x,y
-        return self.get_valid_position_sparx()
+        rng = rng if rng is not None else self.rng
+        random_x = rng.randrange(100, 700, step)
+        random_y = rng.randrange(100, 700, step)
+        while not self.is_valid_move(random_x, random_y):
+            random_x = rng.randrange(100, 700, step)  # any number
+            random_y = rng.randrange(100, 700, step)  # any number
+        return random_x, random_y
 
-    def get_valid_position_sparx(self, step=1):
+    def get_valid_position_sparx(self, step=1, rng=None):
         """
         Generates a RANDOM valid coordinate for a Sparc object (ex. for teleportation)
+        :param rng: random.Random object to draw from; None = the border's
         :return: Tuple
         """
-        random_x = random.randrange(100, 700, step)
-        random_y = random.randrange(100, 700, step)
-        while not self.is_on_the_edges(random_x, random_y):
-            random_x = random.randrange(100, 700, step)  # any number
-            random_y = random.randrange(100, 700, step)  # any number
-        return random_x, random_y
+        perimeter = self.get_perimeter()
+        rng = rng if rng is not None else self.rng
+        return perimeter.get_point_at(perimeter.sample(step, rng))  # uniform arc length -> point (bisect)
 
     # STATIC METHODS - CONVERSIONS & OTHER #
 
     def convert_points_to_lines(points):
         """
         Converts a List of points (tuples) to a list of Line objects
-        :return: list of Lines created by these points
+        :return: tuple of Lines created by these points
         """
-        points.append(points[0])    # Make into a circuit; bc last line goes from last point -> first point
         lines = []
-        for i in range(len(points) - 1):
-            line = Line(points[i], points[i + 1])  # Make points into line objects
+        for i in range(len(points)):    # Make into a circuit; bc last line goes from last point -> first point
+            line = Line(points[i], points[(i + 1) % len(points)])  # Make points into line objects
             lines.append(line)
-        return lines
+        return tuple(lines)
 
-    def convert_lines_to_points(lines):
+    def get_simplified_points(points):  # static
         """
-        Converts a List of Line objects to a List of points (tuples)
-        :return: list of points (tuples) that form these lines
+        Drops repeated points and parts of the path that double back over the line before them
+        :param points: list of tuples (open path)
+        :return: list of tuples
         """
-        t = Trail()
-        t.lines = lines
-        return t.get_trail_points()[:-1]  # HELPER defd in Trail class; [:-1] to remove final point
-
-    def get_index_of(lines, point):
-        """
-        Finds the index of a point in a list of Line objects
-        :param point: tuple
-        :return: index (integer)
-        """
-        for i in range(len(lines)):
-            line = lines[i]
-            if line.contains(point):  # HELPER defd in Line class
-                return i
-        return None  # If point does not exist within any of the lines
-
-    def get_reordered_edges(edges, starting_point):
-        """
-        Reorders a list of Line objects such that the first Line contains the given point
-        :param edges: list of Line objects
-        :param starting_point: tuple, ideally the first point of a Trail object
-        :return: reordered edges (List of Lines)
-        """
-        try:
-            starting_index = Border.get_index_of(edges, starting_point)
-            return edges[starting_index:]+edges[:starting_index]
-        except ValueError:
-            return None  # ex. if it cannot find the index of the starting_point
+        path = []
+        for point in points:
+            while len(path) >= 2 and Line(path[-2], path[-1]).contains(point):    # Backtracking
+                path.pop()
+            if not path or path[-1] != point:
+                path.append(point)
+        return path
 
     def is_on_the_edges(self, x, y, epsilon=0):
         """
-        Checks if the given coordinate occurs in the border edges.
+        Checks if the given coordinate occurs in the border edges (every edge is checked in one vectorized call)
         :param x: x coordinate
         :param y: y coordinate
         :return: True/False
         """
-        for edge in self.get_edges():
-            if edge.contains((x, y, epsilon)):
-                return True
-        return False
+        if self.raster is not None and self.raster.is_exact and epsilon == 0 and \
+                isinstance(x, int) and isinstance(y, int):
+            return self.raster.get(x, y) == Raster.EDGE     # one pixel lookup
+        scanlines = self.get_scanlines()
+        if scanlines is not None:
+            return scanlines.is_on_the_edges(x, y, epsilon)
+        return self.get_segments().index_of(x, y, epsilon) is not None
 
     def get_score(self):
         """
         Calculates user's score
         :return: STRING of % of screen that has been consumed
         """
-        grid = Polygon(self.get_init_grid())
-        max_area = grid.area
-        field = Polygon(self.get_edge_points())
-        field_area = field.area
-        score = round((max_area - field_area) / max_area * 100.0)
-        return str(score)
-
-    # GRAPHIC METHODS #
+        return str(self.get_score_value())
 
-    def draw(self, screen):
+    def get_score_value(self):
         """
-        Draws polygons and borders on the screen
-        :param screen:
-        :return:
+        :return: INTEGER % of screen that has been consumed (from the area cached on the last capture)
         """
-        pygame.draw.polygon(screen, Colour.white, self.get_init_grid())   # EATEN AREA
+        return round((self.max_area - self.field_area) / self.max_area * 100.0)
 
-        pygame.draw.polygon(screen, Colour.purple, self.get_edge_points())   # REMAINING AREA (boundaries)
-
-        for gridline in self.get_init_gridlines():  # 4 SIDES OF THE GRID
-            gridline.draw(screen, Colour.white, 5)
+    def get_area(points):  # static
+        """
+        Calculates the area of a polygon with the shoelace formula
+        :param points: list of tuples
+        :return: area (always positive)
+        """
+        return abs(Border.get_signed_area(points))
 
-    def display_score(self, screen, font):
+    def get_signed_area(points):  # static
         """
-        Displays score at the top-left corner of the game screen.
+        :param points: list of tuples
+        :return: shoelace area; positive/negative depending on the direction of the points
         """
-        score_text = font.render(self.get_score() + " percent", True, Colour.white, Colour.black)
-        score_text_rect = score_text.get_rect()
-        score_text_rect.midleft = (100, 50)
-        screen.blit(score_text, score_text_rect)
+        total = 0
+        for i in range(len(points)):
+            (x1, y1), (x2, y2) = points[i - 1], points[i]
+            total += x1 * y2 - x2 * y1
+        return total / 2
@@ -1,71 +1,117 @@
 import random
+from Line import Line
 
 class Qix:
 
-    def __init__(self, image):
-        self.img = image
-        self.half = 50//2  # HALF SIZE
-
-        self.x = random.randrange(100, 700, 1)  # INITIAL POSITION : RANDOM
-        self.y = random.randrange(100, 700, 1)
-        self.speed = 1
+    def __init__(self, rng=None):
+        """
+        :param rng: random.Random object for positions and targets (seeded for reproducible games); None = module random
+        """
+        self.rng = rng if rng is not None else random
+        self.x = self.rng.randrange(100, 700, 1)  # INITIAL POSITION : RANDOM
+        self.y = self.rng.randrange(100, 700, 1)
+        self.last_x, self.last_y = self.x, self.y   # POSITION BEFORE THE LAST UPDATE (see get_path)
+        self.speed = 120    # PIXELS PER SECOND
+        self.move_remainder = 0     # FRACTION OF A PIXEL LEFT OVER FROM THE LAST MOVES (carried to the next tick)
 
         self.target = self.x, self.y  # INITIAL TARGET (Reached)
 
-    # GRAPHIC METHODS #
+    # ACCESSORS #
 
-    def draw(self, screen, border):
+    def get_path(self):
         """
-        Moves Qix toward target and draws it on the screen.
+        :return: Line from where the Qix was before its last update to where it is now (its movement in one tick)
         """
+        return Line((self.last_x, self.last_y), (self.x, self.y))
+
+    # MAIN METHODS #
+
+    def update(self, border, dt):
+        """
+        Moves Qix toward target.
+        :param dt: seconds of game time to move for
+        """
+        self.last_x, self.last_y = self.x, self.y
         # CHANGE TARGET IF REACHED OR IF TARGET NO LONGER IN BOUNDS
         if self.target == (self.x, self.y) or not border.is_valid_move(self.target[0], self.target[1]):
             self.choose_target(border)
+        self.move_remainder += self.speed * dt  # whole pixels (the fraction carries over); never overshoots the target
+        distance = int(self.move_remainder)
+        self.move_remainder -= distance
 
         # HORIZONTAL SHIFT
         if self.target[0] > self.x:
-            self.x += self.speed
+            self.x += min(distance, self.target[0] - self.x)
         elif self.target[0] < self.x:
-            self.x -=  self.speed
-        screen.blit(self.img, (self.x - self.half, self.y - self.half))
+            self.x -= min(distance, self.x - self.target[0])
 
         # VERTICAL SHIFT TOWARD TARGET
         if self.target[1] > self.y:
-            self.y += self.speed
+            self.y += min(distance, self.target[1] - self.y)
         elif self.target[1] < self.y:
-            self.y -= self.speed
-        screen.blit(self.img, (self.x - self.half, self.y - self.half))
+            self.y -= min(distance, self.y - self.target[1])
 
     def choose_target(self, border, teleport=False):
         """
         Changes the Qix' target location.
         """
-        self.target = border.get_valid_position()
+        self.target = border.get_valid_position(rng=self.rng)
         if teleport:
             self.x, self.y = self.target
+            self.last_x, self.last_y = self.x, self.y   # (a teleport is not a movement)
 
 class Sparx:
     
-    def __init__(self, image):
-        self.img = image
-        self.half = 50//2   # PNG DIMENSIONS
-
+    def __init__(self, rng=None):
+        """
+        :param rng: random.Random object for teleports (seeded for reproducible games); None = module random
+        """
+        self.rng = rng if rng is not None else random
         self.x = 400   # INITIAL POSITION : TOP CENTER
         self.y = 100
-        self.speed = 1
+        self.last_x, self.last_y = self.x, self.y   # POSITION BEFORE THE LAST UPDATE (see get_path)
+        self.speed = 120            # PIXELS PER SECOND
+        self.position = None        # ARC-LENGTH POSITION ALONG THE BORDER'S PERIMETER
+        self.border_version = None  # BORDER VERSION THAT position REFERS TO
 
         self.teleport = False   # FORCE TELEPORT
 
-    def draw(self, screen, border):
+    # ACCESSORS #
+
+    def get_path(self):
+        """
+        :return: Line from where the Sparc was before its last update to where it is now (a chord if it went around a
+                 corner; no movement after a teleport)
         """
-        Moves Sparc as needed and draws it on the screen.
+        return Line((self.last_x, self.last_y), (self.x, self.y))
+
+    # MAIN METHODS #
+
+    def update(self, border, dt):
+        """
+        Moves Sparc as needed.
+        :param dt: seconds of game time to move for
         """
         if self.teleport:
             self.teleport = False
-            self.x, self.y = border.get_valid_position_sparx()
+            self.x, self.y = border.get_valid_position_sparx(rng=self.rng)
+            self.last_x, self.last_y = self.x, self.y   # (a teleport is not a movement)
+            self.position = None
         else:
-            self.x, self.y = border.get_next_sparx_position(self.x, self.y)
-        screen.blit(self.img, (self.x - self.half, self.y - self.half))
+            self.last_x, self.last_y = self.x, self.y
+            self.move(border, dt)
+
+    def move(self, border, dt):
+        """
+        Advances the Sparc along the border's perimeter by its speed.
+        :param dt: seconds of game time to move for
+        """
+        perimeter = border.get_perimeter()
+        if self.position is None or self.border_version != border.version:  # REMAP TO NEAREST POINT (ex. after capture)
+            self.position = perimeter.get_position_of(self.x, self.y)
+            self.border_version = border.version
+        self.position = (self.position + self.speed * dt) % perimeter.length
+        self.x, self.y = perimeter.get_point_at(self.position)
 
     def teleport_me(self):
         """
@@ -0,0 +1,86 @@
+import random
+from bisect import bisect_right
+
+
+class Field:
+    """
+    Rectangle decomposition of the remaining (rectilinear) field, built once per capture
+    """
+    def __init__(self, points, origin=100, limit=700):
+        self.origin = origin            # GRID THAT RANDOM POSITIONS SNAP TO: origin, origin+step, ... < limit
+        self.limit = limit
+
+        self.rectangles = []            # (left, top, right, bottom) - SLABS BETWEEN CONSECUTIVE VERTEX ROWS
+        self.cumulative_areas = []      # running total of rectangle areas (for area-weighted picks)
+        self.area = 0
+
+        self.is_rectilinear = Field.check_rectilinear(points)
+        if self.is_rectilinear:
+            self.build(points)
+
+    # MAIN METHODS #
+
+    def sample(self, step=1, rng=random, tries=16):
+        """
+        Picks a rectangle weighted by its area, then a uniform point on the step grid inside it
+        :param step: grid granularity (same as random.randrange(origin, limit, step))
+        :param rng: random.Random-like object
+        :return: Tuple; None if no grid point could be found (ex. step is wider than every rectangle)
+        """
+        if self.area <= 0:
+            return None
+
+        for _ in range(tries):
+            index = bisect_right(self.cumulative_areas, rng.random() * self.area)
+            left, top, right, bottom = self.rectangles[min(index, len(self.rectangles) - 1)]
+            x = self.random_on_grid(left, right, step, rng)
+            y = self.random_on_grid(top, bottom, step, rng)
+            if x is not None and y is not None:
+                return x, y
+        return None
+
+    # HELPER FUNCTIONS #
+
+    def build(self, points):
+        """
+        Splits the polygon into horizontal slabs at every vertex row; each slab is cut into rectangles by the
+        vertical edges crossing it (even-odd rule)
+        :param points: list of tuples (rectilinear polygon)
+        """
+        verticals = []
+        for i in range(len(points)):
+            (x1, y1), (x2, y2) = points[i - 1], points[i]
+            if x1 == x2 and y1 != y2:
+                verticals.append((x1, min(y1, y2), max(y1, y2)))
+
+        rows = sorted(set(point[1] for point in points))
+        for top, bottom in zip(rows, rows[1:]):
+            middle = (top + bottom) / 2
+            crossings = sorted(x for x, low, high in verticals if low < middle < high)
+            for left, right in zip(crossings[0::2], crossings[1::2]):
+                if right > left:
+                    self.rectangles.append((left, top, right, bottom))
+                    self.area += (right - left) * (bottom - top)
+                    self.cumulative_areas.append(self.area)
+
+    def random_on_grid(self, low, high, step, rng):
+        """
+        Gets a random value of the step grid within [low, high]
+        :return: int; None if no grid value falls in the range
+        """
+        first = low + (self.origin - low) % step
+        last = min(high, self.limit - 1)
+        if first > last:
+            return None
+        return rng.randrange(first, last + 1, step)
+
+    def check_rectilinear(points):  # static
+        """
+        Checks that every edge of the polygon is horizontal or vertical
+        :return: True/False
+        """
+        for i in range(len(points)):
+            (x1, y1), (x2, y2) = points[i - 1], points[i]
+            if x1 != x2 and y1 != y2:
+                return False
+        return True
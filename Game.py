@@ -0,0 +1,118 @@
+import hashlib
+import random
+from Border import Border
+from Enemy import Qix, Sparx
+from Player import Player
+from Profiler import Profiler
+
+
+class GameState:
+    """
+    Pure game logic (no pygame): one step() is one tick of the game
+    """
+    TICK_RATE = 120                             # LOGIC TICKS PER SECOND (fixed timestep)
+    TICK = 1 / TICK_RATE                        # SECONDS OF GAME TIME PER TICK
+    QUIT = "QUIT"                               # INPUT ACTION (others are the Player actions)
+    HIT, LEVEL_UP, WIN = "HIT", "LEVEL_UP", "WIN"   # EVENTS RETURNED BY step()
+
+    def __init__(self, profiler=None, seed=None):
+        """
+        :param profiler: Profiler object that times the phases of step(); None for a disabled one
+        :param seed: seed of the game's random numbers - the same seed and inputs replay the same game (see Replay)
+        """
+        self.seed = seed
+        self.rng = random.Random(seed)  # ALL RANDOMNESS OF THE GAME (positions, targets, teleports)
+        self.border = Border(rng=self.rng)
+        self.player = Player()
+        self.qix = Qix(self.rng)
+        self.sparx = Sparx(self.rng)
+        self.level = 1
+        self.win_score = 75     # % OF THE SCREEN TO CLAIM TO FINISH A LEVEL
+
+        self.ticks = 0
+        self.time = 0           # SECONDS OF GAME TIME
+        self.running = True     # False once the user quits
+        self.won = False
+        self.freeze_time = 0    # SECONDS LEFT OF THE FREEZE AFTER A COLLISION (nothing moves)
+        self.profiler = profiler if profiler is not None else Profiler()
+
+    # ACCESSORS #
+
+    def is_over(self):
+        return self.won or self.player.is_dead()
+
+    def get_hash(self):
+        """
+        :return: short hex digest of everything that decides how the game goes on (ex. to check a replay)
+        """
+        player, qix, sparx = self.player, self.qix, self.sparx
+        state = (self.ticks, self.level, self.won, self.freeze_time, self.border.get_edge_points(),
+                 player.x, player.y, player.move_remainder, player.lives, player.change_horizontal,
+                 player.change_vertical, player.hit_time,
+                 tuple((line.endpoint1, line.endpoint2) for line in player.get_trail().get_lines()),
+                 qix.x, qix.y, qix.move_remainder, qix.target, sparx.x, sparx.y, sparx.position, self.rng.getstate())
+        return hashlib.sha256(repr(state).encode()).hexdigest()[:16]
+
+    def get_enemies(self):
+        """
+        :return: list of (enemy, isSparc) tuples that are active on this level
+        """
+        if self.level == 2:
+            return [(self.qix, False), (self.sparx, True)]
+        return [(self.qix, False)]
+
+    # MAIN METHODS #
+
+    def step(self, inputs=(), dt=TICK):
+        """
+        Advances the game by one tick
+        :param inputs: list of actions (Player.UP/DOWN/LEFT/RIGHT/TELEPORT/STOP or GameState.QUIT) for this tick
+        :param dt: seconds of game time per tick (movement and timers scale with it)
+        :return: list of events (GameState.HIT/LEVEL_UP/WIN) that happened during this tick
+        """
+        events = []
+        if self.is_over():
+            return events
+
+        for action in inputs:                       # 1. INPUT
+            if action == GameState.QUIT:
+                self.running = False
+            else:
+                self.player.apply_input(action)
+
+        self.ticks += 1
+        self.time += dt
+        if self.freeze_time > 0:                    # FROZEN AFTER A COLLISION
+            self.freeze_time = max(self.freeze_time - dt, 0)
+            self.player.update_hit(dt)
+            return events
+
+        profiler = self.profiler
+        profiler.start("movement")
+        self.player.update_xy(self.border, dt, (self.qix.x, self.qix.y))    # 2. MOVEMENT (captures keep the Qix)
+        profiler.start("enemies")
+        self.qix.update(self.border, dt)
+        if self.level == 2:                         # LEVEL 2 - EXCLUSIVE UPDATES
+            self.sparx.update(self.border, dt)
+
+        profiler.start("collision")
+        is_hit = self.player.check_collisions(self.get_enemies(), self.border)     # 3. COLLISIONS
+        self.player.update_hit(dt, is_hit)
+        self.freeze_time, self.player.hit_pause = self.player.hit_pause, 0
+        if is_hit and not self.player.is_dead():
+            events.append(GameState.HIT)
+        profiler.stop()
+
+        if self.border.get_score_value() > self.win_score:     # 4. LEVEL PROGRESS
+            if self.level == 2:
+                self.won = True
+                events.append(GameState.WIN)
+            else:
+                self.level_up()
+                events.append(GameState.LEVEL_UP)
+        return events
+
+    def level_up(self):
+        self.level = 2
+        self.player.x, self.player.y = 400, 700     # Reset
+        self.border.reset_edges()                   # Reset
@@ -1,12 +1,25 @@
-import pygame
-from copy import deepcopy
-from Graphic import Colour
+from SegmentGrid import SegmentGrid
+from Segments import SegmentArray
 
 
 class Line:
+    __slots__ = ("endpoint1", "endpoint2")     # IMMUTABLE VALUE: safe to share; make a new Line instead of modifying
+
     def __init__(self, endpoint1, endpoint2=None):
-        self.endpoint1 = endpoint1
-        self.endpoint2 = endpoint2
+        object.__setattr__(self, "endpoint1", endpoint1)
+        object.__setattr__(self, "endpoint2", endpoint2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Line is immutable")
+
+    def __reduce__(self):   # copy/pickle support (slots + immutability)
+        return Line, (self.endpoint1, self.endpoint2)
+
+    def __eq__(self, other):
+        return isinstance(other, Line) and self.endpoint1 == other.endpoint1 and self.endpoint2 == other.endpoint2
+
+    def __hash__(self):
+        return hash((self.endpoint1, self.endpoint2))
 
     # ACCESSORS #
 
@@ -43,87 +56,146 @@ class Line:
         except:
             return False  # ex. if Point is not a tuple/list
 
-    def intersects(self, line):
+    def contains_path(self, path, epsilon=0):
+        """
+        Swept version of contains: checks if any point of the given path (ex. where an enemy moved during one tick) is
+        on this line, by clipping the path against the bounds that contains checks a single point against
+        :param path: Line object
+        :return: True if the path touches the line/False otherwise
+        """
+        try:
+            (x1, y1), (x2, y2) = path.endpoint1, path.endpoint2
+            (left, top), (right, bottom) = self.endpoint1, self.endpoint2
+        except TypeError:
+            return False  # ex. if either line is still in progress (endpoint2 is None)
+        if left > right:
+            left, right = right, left
+        if top > bottom:
+            top, bottom = bottom, top
+        left, top, right, bottom = left - epsilon, top - epsilon, right + epsilon, bottom + epsilon
+        if (x1 < left and x2 < left) or (x1 > right and x2 > right) or \
+                (y1 < top and y2 < top) or (y1 > bottom and y2 > bottom):
+            return False  # bounding boxes do not overlap
+        if x1 == x2 or y1 == y2:
+            return True   # horizontal/vertical path: overlapping boxes are enough
+
+        first, last = 0, 1      # PART OF THE PATH (0 = endpoint1, 1 = endpoint2) STILL WITHIN BOUNDS
+        for start, delta, low, high in ((x1, x2 - x1, left, right), (y1, y2 - y1, top, bottom)):
+            enter, leave = (low - start) / delta, (high - start) / delta
+            if delta < 0:
+                enter, leave = leave, enter
+            first, last = max(first, enter), min(last, leave)
+        return first <= last
+
+    def intersects(self, line, epsilon=0):
         """
         Checks if the given line intersects this line
         :return: True if intersects/False otherwise
         """
-        return self.get_POI(line) is not None
+        return self.get_POI(line, epsilon) is not None
 
-    def get_POI(self, line):
+    def get_POI(self, line, epsilon=0):
         """
         Finds the point of intersection (POI) of the given line and this line
-        :return: Tuple of POI; None if no POI
+        :param line: Line object
+        :param epsilon: tolerance (distance from this line that still counts as intersecting)
+        :return: Tuple of POI (the one closest to line.endpoint1 if they overlap); None if no POI
         """
-        x = line.x1()
-        y = line.y1()
-
-        while line.contains((x, y)):  # Iterate through given line
-            if self.contains((x, y)):  # Check if point is on this line
-                return (x, y)
-            x = line.get_next_x(x)
-            y = line.get_next_y(y)
-        return None  # No point of intersection
-
-    def compare_POIs(self, point1, point2):
-        """
-        Checks that point1 appears on this line before point2
-        :param point1: tuple that is on this line
-        :param point2: tuple
-        :return: False if point2 occurs before point1
-        """
-        same_x = (point1[0] == point2[0])
-        same_y = (point1[1] == point2[1])
-        if same_x:
-            return abs(point1[1] - self.y1()) <= abs(point2[1] - self.y1())
-        elif same_y:
-            return abs(point1[0] - self.x1()) <= abs(point2[0] - self.x1())
+        try:
+            if self.is_axis_aligned() and line.is_axis_aligned():
+                return self.get_axis_aligned_POI(line, epsilon)
+            return self.get_general_POI(line, epsilon)
+        except TypeError:
+            return None  # ex. if either line is still in progress (endpoint2 is None)
 
     # GENERAL HELPER METHODS #
 
-    def get_reverse(self):
+    def is_axis_aligned(self):
+        return self.x1() == self.x2() or self.y1() == self.y2()
+
+    def get_axis_aligned_POI(self, line, epsilon=0):
         """
-        Gets the Line that goes in the opposite direction
-        :return: Line object
+        Closed-form POI when both lines are horizontal/vertical: clips the given line against this line's bounds
+        :return: Tuple of POI; None if no POI
         """
-        return Line(self.endpoint2, self.endpoint1)
-
-    def get_next_x(self, current_x):    # iteration method
-        return Line.get_next(current_x, self.x1(), self.x2())
+        x1, y1 = line.x1(), line.y1()
+        x_dir = (line.x2() > x1) - (line.x2() < x1)   # -1/0/1 (direction of travel along the given line)
+        y_dir = (line.y2() > y1) - (line.y2() < y1)
+
+        first, last = 0, abs(line.x2() - x1) + abs(line.y2() - y1)  # distance travelled from line.endpoint1
+        for start, direction, low, high in ((x1, x_dir, min(self.x1(), self.x2()), max(self.x1(), self.x2())),
+                                            (y1, y_dir, min(self.y1(), self.y2()), max(self.y1(), self.y2()))):
+            low, high = low - epsilon, high + epsilon
+            if direction == 0:
+                if not low <= start <= high:
+                    return None
+            elif direction > 0:
+                first, last = max(first, low - start), min(last, high - start)
+            else:
+                first, last = max(first, start - high), min(last, start - low)
 
-    def get_next_y(self, current_y):    # iteration method
-        return Line.get_next(current_y, self.y1(), self.y2())
+        if first > last:
+            return None
+        return x1 + first * x_dir, y1 + first * y_dir
 
-    def get_next(current, min, max): # static
+    def get_general_POI(self, line, epsilon=0):
         """
-        Gets next value of the line (to help with iterating through the line)
-        :return: int
+        Closed-form POI of any two segments (parametric form, with epsilon tolerance)
+        :return: Tuple of POI; None if no POI
         """
-        if min == max:
-            return current
-        elif min < max:   # max is max
-            if current >= max:
-                return None     # cannot iterate
-            return current+1
-        elif min > max:   # min is max
-            if current <= max:
-                return None     # cannot iterate
-            return current-1
+        px, py = line.x1(), line.y1()
+        rx, ry = line.x2() - px, line.y2() - py     # given line: p + t*r (0 <= t <= 1)
+        qx, qy = self.x1(), self.y1()
+        sx, sy = self.x2() - qx, self.y2() - qy     # this line: q + u*s (0 <= u <= 1)
+
+        r_length = (rx * rx + ry * ry)**0.5
+        s_length = (sx * sx + sy * sy)**0.5
+        if r_length == 0:   # given line is a point
+            return (px, py) if self.get_distance_to((px, py)) <= epsilon else None
+
+        denominator = rx * sy - ry * sx
+        qpx, qpy = qx - px, qy - py
+        if abs(denominator) > 1e-9 * r_length * max(s_length, 1):   # NOT PARALLEL
+            t = (qpx * sy - qpy * sx) / denominator
+            u = (qpx * ry - qpy * rx) / denominator
+            t_tolerance = epsilon / r_length
+            u_tolerance = epsilon / s_length
+            if -t_tolerance <= t <= 1 + t_tolerance and -u_tolerance <= u <= 1 + u_tolerance:
+                t = min(max(t, 0), 1)
+                return px + t * rx, py + t * ry
+            return None
+
+        if abs(qpx * ry - qpy * rx) / r_length > epsilon:   # PARALLEL BUT NOT COLLINEAR
+            return None
+        t_q1 = (qpx * rx + qpy * ry) / (r_length * r_length)  # COLLINEAR: project this line onto the given one
+        t_q2 = t_q1 + (sx * rx + sy * ry) / (r_length * r_length)
+        t_tolerance = epsilon / r_length
+        first = max(min(t_q1, t_q2) - t_tolerance, 0)
+        if first > min(max(t_q1, t_q2) + t_tolerance, 1):
+            return None
+        return px + first * rx, py + first * ry
+
+    def get_distance_to(self, point):
+        """
+        :return: shortest distance from the given point to this line (float)
+        """
+        x1, y1 = self.x1(), self.y1()
+        dx, dy = self.x2() - x1, self.y2() - y1
+        length_sq = dx * dx + dy * dy
+        ratio = 0
+        if length_sq > 0:
+            ratio = min(max(((point[0] - x1) * dx + (point[1] - y1) * dy) / length_sq, 0), 1)
+        return ((point[0] - x1 - ratio * dx)**2 + (point[1] - y1 - ratio * dy)**2)**0.5
 
     def __str__(self):
         return "<Line:"+str(self.endpoint1)+"->"+str(self.endpoint2)+">"
 
-    # GRAPHICS METHOD #
-
-    def draw(self, screen, colour = Colour.blue, thickness = 5):
-        """
-        Draws line object on the screen
-        """
-        pygame.draw.line(screen, colour, self.endpoint1, self.endpoint2, thickness)
-
 class Trail:
     def __init__(self):
         self.lines = []
+        self.grid = SegmentGrid()       # SPATIAL INDEX OF self.lines (kept in sync by the mutators below)
+        self.segments = SegmentArray()  # NUMPY ARRAYS OF self.lines (kept in sync by the mutators below)
+        self.indexed_lines = self.lines # list that self.grid and self.segments were built for
 
     # ACCESSOR METHODS #
 
@@ -131,7 +203,10 @@ class Trail:
         return len(self) <= 0
 
     def get_lines(self):
-        return deepcopy(self.lines)
+        """
+        :return: tuple of Lines (a snapshot: the trail only changes through its mutators, which keep the indexes in sync)
+        """
+        return tuple(self.lines)
 
     def get_last_line(self):
         return self.lines[-1]
@@ -139,28 +214,40 @@ class Trail:
     def get_first_point(self):
         return self.lines[0].endpoint1
 
-    def get_last_point(self):
-        return self.get_last_line().endpoint2
+    def get_open_line(self, endpoint):
+        """
+        :param endpoint: current end of the line in progress (ex. player's position)
+        :return: Line from the start of the last line to the given endpoint
+        """
+        return Line(self.get_last_line().endpoint1, endpoint)
 
     def get_distance(self):
         """
         :return: sum of trail line lengths (float)
         """
         distance = 0
-        for line in self.get_lines():
+        for line in self.lines:
             distance += line.get_distance()
         return distance
 
     # SIMPLE MUTATOR METHODS #
 
     def add_line(self, line):
+        grid, segments = self.get_grid(), self.get_segments()     # sync the indexes before appending
         self.lines.append(line)
+        grid.insert(len(self.lines) - 1, line)
+        segments.append(line)
+
+    def set_lines(self, lines):
+        self.lines = list(lines)    # grid and segments are rebuilt lazily on the next query (see get_grid)
 
     def empty_trail(self):
-        self.lines = []
+        self.set_lines([])
     
     def set_last_point(self, last_point):
-        self.get_last_line().endpoint2 = last_point
+        self.lines[-1] = Line(self.get_last_line().endpoint1, last_point)
+        self.get_grid().insert(len(self.lines) - 1, self.get_last_line())
+        self.segments.set(len(self.lines) - 1, self.get_last_line())
 
     # METHODS RELATED TO MODIFYING THE TRAIL (in real time) #
 
@@ -185,7 +272,9 @@ class Trail:
                 if self.contains(x, y):     # Check for backtracking
                     self.backtrack_to_line_with(x, y)
                 self.add_endpoint((x, y))
+        self.get_grid().remove(len(self.lines) - 1)
         self.lines.pop()                    # Remove last line (ex. the Line(last_point->NONE))
+        self.segments.truncate(len(self.lines))
 
     def backtrack_to_line_with(self, x, y):
         """
@@ -194,17 +283,20 @@ class Trail:
         :param y: y-coordinate
         :return: True if backtracking was done; False if no backtracking needed
         """
-        lines = []                          # All lines that occur in the trail before the backtracking point
-        for line in self.get_lines():
-            if line.contains((x, y)):       # Backtracking needed
-                modified_line = Line(line.endpoint1, (x,y))
-                lines.append(modified_line)
-                self.lines = lines          # Update => Successfully backtracked!
-                self.add_endpoint((x, y))   # Create a new point at this backtracking point
-                return True
-            else:
-                lines.append(line)
-        return False
+        grid = self.get_grid()
+        index = self.segments.index_of(x, y)    # First line where backtracking is needed
+        if index is None:
+            return False
+
+        for i in range(index + 1, len(self.lines)):
+            grid.remove(i)                  # Drop all lines that occur after the backtracking point
+        del self.lines[index + 1:]
+        self.segments.truncate(index + 1)
+        self.lines[index] = Line(self.lines[index].endpoint1, (x, y))
+        grid.insert(index, self.lines[index])   # Update => Successfully backtracked!
+        self.segments.set(index, self.lines[index])
+        self.add_endpoint((x, y))           # Create a new point at this backtracking point
+        return True
 
     # METHODS RELATED TO MODIFYING THE TRAIL (once last point has been reached)
 
@@ -217,7 +309,7 @@ class Trail:
             return False
 
         true_points = [self.get_first_point()]
-        for line in self.get_lines():
+        for line in self.lines:
             if line.endpoint1 != line.endpoint2:    # Ignore lines that are points (= invalid)
                 true_points.append(line.endpoint2)
 
@@ -232,26 +324,46 @@ class Trail:
 
     def contains(self, x, y, epsilon=0, ignore_last_line=True):
         """
-        Checks whether a given point is already in the trail
+        Checks whether a given point is already in the trail (only lines in nearby grid cells are checked)
         :return: True if point occurs in the trail/False otherwise
         """
-        temp_lines = deepcopy(self.lines)
-        if ignore_last_line:
-            temp_lines = temp_lines[:-1]  # don't include last line of trail?
-        for line in temp_lines:
-            if line.contains((x, y, epsilon)):
+        end = len(self.lines) - 1 if ignore_last_line else len(self.lines)  # don't include last line of trail?
+        for i in self.get_grid().query(x, y, epsilon):
+            if i < end and self.lines[i].contains((x, y), epsilon):
                 return True
         return False
 
-    def compare_POIs(self, edges, point1, point2):
+    def contains_with(self, x, y, open_line, epsilon=0):
         """
-        Finds the line that contains both point1 and point2, then compares which of them occurs first (for direction)
-        :param edges: list of Line objects
-        :return: True if point1 is first on the line
+        Checks a point against the live trail: the committed lines plus the line still in progress (no copying)
+        :param open_line: Line object that replaces the last line of the trail (see get_open_line)
+        :return: True if point occurs in the live trail/False otherwise
+        """
+        return self.contains(x, y, epsilon) or open_line.contains((x, y), epsilon)
+
+    def contains_path(self, path, epsilon=0, ignore_last_line=True):
         """
-        for edge in edges:
-            if edge.contains(point1) and edge.contains(point2):
-                return edge.compare_POIs(point1, point2)
+        Swept version of contains: checks whether any point of the given path is in the trail (only lines in the grid
+        cells around the path are checked)
+        :param path: Line object (ex. where an enemy moved during one tick)
+        :return: True if the path touches the trail/False otherwise
+        """
+        end = len(self.lines) - 1 if ignore_last_line else len(self.lines)
+        left, right = sorted((path.x1(), path.x2()))
+        top, bottom = sorted((path.y1(), path.y2()))
+        for i in self.get_grid().query_box(left - epsilon, top - epsilon, right + epsilon, bottom + epsilon):
+            if i < end and self.lines[i].contains_path(path, epsilon):
+                return True
+        return False
+
+    def contains_path_with(self, path, open_line, epsilon=0):
+        """
+        Swept version of contains_with (committed lines + the line still in progress)
+        :param path: Line object
+        :param open_line: Line object that replaces the last line of the trail (see get_open_line)
+        :return: True if the path touches the live trail/False otherwise
+        """
+        return self.contains_path(path, epsilon) or open_line.contains_path(path, epsilon)
 
     # CONVERSION HELPER METHODS #
 
@@ -267,17 +379,28 @@ class Trail:
 
     # GENERAL HELPER METHODS #
 
-    def get_reverse(lines):
+    def get_grid(self):
         """
-        Gets the trail that moves from last point to first point
-        :return: list of Line objects
+        :return: SegmentGrid of self.lines (rebuilt first if self.lines was replaced from outside)
         """
-        temp = deepcopy(lines)
-        temp.reverse() # reverse the list
-        rev_lines = []
-        for line in temp:
-            rev_lines.append(line.get_reverse())
-        return rev_lines
+        if self.indexed_lines is not self.lines:
+            self.reindex()
+        return self.grid
+
+    def get_segments(self):
+        """
+        :return: SegmentArray of self.lines (rebuilt first if self.lines was replaced from outside)
+        """
+        if self.indexed_lines is not self.lines:
+            self.reindex()
+        return self.segments
+
+    def reindex(self):
+        self.grid.clear()
+        for i in range(len(self.lines)):
+            self.grid.insert(i, self.lines[i])
+        self.segments = SegmentArray(self.lines)
+        self.indexed_lines = self.lines
 
     def __len__(self):
         return len(self.lines)
@@ -287,17 +410,3 @@ class Trail:
         for line in self.lines:
             string += " -> "+str(line)
         return string+"]"
-
-    # GRAPHICS METHOD #
-
-    def draw(self, screen, endpoint):
-        """
-        Draws trail object on the screen
-        :param endpoint: player's current coordinate (line still in progress; not yet added to the trail)
-        """
-        for line in self.lines:
-            if line.endpoint2 is None:
-                current_line = Line(line.endpoint1, endpoint)
-                current_line.draw(screen)
-            else:
-                line.draw(screen)
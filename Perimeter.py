@@ -0,0 +1,81 @@
+import random
+from bisect import bisect_right
+
+
+class Perimeter:
+    """
+    Cumulative arc-length table over a closed polygon (edge i goes from points[i] to points[i+1], wrapping around)
+    """
+    def __init__(self, points):
+        self.points = points
+        self.cumulative_lengths = [0]   # ARC LENGTH AT THE START OF EACH EDGE; last entry = total length
+        for i in range(len(points)):
+            (x1, y1), (x2, y2) = points[i], points[(i + 1) % len(points)]
+            length = (((x2 - x1)**2) + ((y2 - y1)**2))**0.5
+            if x1 == x2 or y1 == y2:
+                length = abs(x2 - x1) + abs(y2 - y1)    # keep axis-aligned lengths as exact ints
+            self.cumulative_lengths.append(self.cumulative_lengths[-1] + length)
+        self.length = self.cumulative_lengths[-1]
+
+    # MAIN METHODS #
+
+    def get_point_at(self, position):
+        """
+        Maps an arc-length position (wraps around) to the point on the perimeter
+        :param position: number
+        :return: Tuple
+        """
+        position %= self.length
+        i = bisect_right(self.cumulative_lengths, position) - 1    # skips zero-length edges
+        return self.get_point_on_edge(i, position - self.cumulative_lengths[i])
+
+    def get_position_of(self, x, y):
+        """
+        Finds the arc-length position of the point on the perimeter that is closest to (x, y)
+        :return: number (0 <= position < length)
+        """
+        best_position = 0
+        best_distance = None
+        for i in range(len(self.points)):
+            edge_length = self.cumulative_lengths[i + 1] - self.cumulative_lengths[i]
+            if edge_length == 0:
+                continue
+            (x1, y1), (x2, y2) = self.points[i], self.points[(i + 1) % len(self.points)]
+            if y1 == y2:    # HORIZONTAL
+                offset = x - x1 if x2 > x1 else x1 - x
+            elif x1 == x2:  # VERTICAL
+                offset = y - y1 if y2 > y1 else y1 - y
+            else:
+                offset = ((x - x1) * (x2 - x1) + (y - y1) * (y2 - y1)) / edge_length
+            offset = min(max(offset, 0), edge_length)
+
+            px, py = self.get_point_on_edge(i, offset)
+            distance = (x - px)**2 + (y - py)**2
+            if best_distance is None or distance < best_distance:
+                best_distance = distance
+                best_position = self.cumulative_lengths[i] + offset
+        return best_position % self.length
+
+    def sample(self, step=1, rng=random):
+        """
+        Picks a uniform arc-length position along the perimeter
+        :param step: position granularity
+        :return: number
+        """
+        return rng.randrange(0, int(self.length), step)
+
+    # HELPER FUNCTIONS #
+
+    def get_point_on_edge(self, i, offset):
+        """
+        :param i: edge index
+        :param offset: distance from the start of edge i
+        :return: Tuple
+        """
+        (x1, y1), (x2, y2) = self.points[i], self.points[(i + 1) % len(self.points)]
+        if y1 == y2:    # HORIZONTAL
+            return (x1 + offset if x2 > x1 else x1 - offset), y1
+        if x1 == x2:    # VERTICAL
+            return x1, (y1 + offset if y2 > y1 else y1 - offset)
+        ratio = offset / (self.cumulative_lengths[i + 1] - self.cumulative_lengths[i])
+        return x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio
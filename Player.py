@@ -1,20 +1,18 @@
-import pygame
-from copy import deepcopy
-from Line import Trail, Line
-from Graphic import Colour
+from Line import Line, Trail
 
 
 class Player:
-    def __init__(self, image):
-        self.img = image
-        self.img_hit = pygame.image.load("icon01.png")
-        self.half = 50//2   # PNG DIMENSIONS
+    UP, DOWN, LEFT, RIGHT, TELEPORT, STOP = "UP", "DOWN", "LEFT", "RIGHT", "TELEPORT", "STOP"   # INPUT ACTIONS
 
+    def __init__(self):
         self.lives = 3      # HEALTH POINTS
-        self.speed = 2
+        self.speed = 240    # PIXELS PER SECOND
+        self.move_remainder = 0         # FRACTION OF A PIXEL LEFT OVER FROM THE LAST MOVES (carried to the next tick)
+        self.collision_epsilon = 25     # PIXELS AROUND THE PLAYER THAT COUNT AS A HIT (the trail only counts exactly)
 
         self.x = 400        # INITIAL POSITION : BOTTOM CENTER
         self.y = 700
+        self.last_x, self.last_y = self.x, self.y   # POSITION BEFORE THE LAST update_xy (see is_hit_by)
         self.change_horizontal = 0
         self.change_vertical = 0
         self.dir = ""
@@ -22,7 +20,8 @@ class Player:
         self.trail.add_endpoint((self.x, self.y))
 
         self.force_teleport = False
-        self.is_hit = 0
+        self.hit_time = 0       # SECONDS LEFT TO SHOW THE HIT IMAGE
+        self.hit_pause = 0      # SECONDS THE GAME FREEZES FOR AFTER A COLLISION (honoured by GameState)
 
     # ACCESSORS #
 
@@ -37,49 +36,48 @@ class Player:
 
     # MAIN METHODS #
 
-    def get_move(self):
-        """
-        Read and process user input
-        :return: False to quit game
-        """
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:          # CLICK 'X' - QUIT
-                return False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:       # 'UP' - MOVE UP
-                    self.change_up()
-                elif event.key == pygame.K_DOWN:   # 'DOWN' - MOVE DOWN
-                    self.change_down()
-                elif event.key == pygame.K_RIGHT:  # 'RIGHT' - MOVE RIGHT
-                    self.change_right()
-                elif event.key == pygame.K_LEFT:   # 'LEFT' - MOVE LEFT
-                    self.change_left()
-                elif event.key == pygame.K_SPACE:  # 'SPACE' - TELEPORT TO RANDOM PART OF THE SCREEN
-                    self.teleport()
-                elif event.key == pygame.K_q:      # 'Q' - QUIT
-                    return False
-            if event.type == pygame.KEYUP:         # NO INPUT - STOP
-                self.stop()
-        return True
-
-    def update_xy(self, border):
+    def apply_input(self, action):
+        """
+        Process one user input
+        :param action: one of the Player.UP/DOWN/LEFT/RIGHT/TELEPORT/STOP actions
+        """
+        if action == Player.UP:            # MOVE UP
+            self.change_up()
+        elif action == Player.DOWN:        # MOVE DOWN
+            self.change_down()
+        elif action == Player.RIGHT:       # MOVE RIGHT
+            self.change_right()
+        elif action == Player.LEFT:        # MOVE LEFT
+            self.change_left()
+        elif action == Player.TELEPORT:    # TELEPORT TO RANDOM PART OF THE SCREEN
+            self.teleport()
+        elif action == Player.STOP:        # NO INPUT - STOP
+            self.stop()
+
+    def update_xy(self, border, dt, keep_point=None):
         """
         Updates player's x and y coordinate.
         :param border: Border object
+        :param dt: seconds of game time to move for
+        :param keep_point: tuple that a capture must leave in the field (ex. the Qix's position); None = larger part
         :return: True if player's x and y were updated/modified; False if they are the same
         """
+        self.last_x, self.last_y = self.x, self.y
         if self.force_teleport: # 1. CHECK FOR FORCED TELEPORT MOVEMENT (if user presses <SPACE>)
             self.force_teleport = False
             self.x, self.y = border.get_valid_position(20)
+            self.last_x, self.last_y = self.x, self.y   # (a teleport is not a movement)
             return True
 
         if self.change_horizontal == 0 and self.change_vertical == 0:  # 2. CHECK FOR NO UPDATE NEEDED
             return False
 
-        new_x = self.x + self.change_horizontal  # 3. ASSIGN UPDATES TO TEMPORARY VARIABLES
-        new_y = self.y + self.change_vertical
+        self.move_remainder += self.speed * dt   # 3. WHOLE PIXELS TO MOVE (the fraction carries over to the next tick)
+        distance = int(self.move_remainder)
+        self.move_remainder -= distance
+        new_x, new_y = self.get_step_end(border, distance)
 
-        if border.is_valid_move(new_x, new_y):  # 4. CHECK THAT UPDATE IS VALID (within borders)
+        if (new_x, new_y) != (self.x, self.y):  # 4. CHECK THAT THE STEP GOT ANYWHERE (it stops at the borders)
             self.x = new_x                      # 5. UPDATE INSTANCE VARIABLES
             self.y = new_y
 
@@ -93,7 +91,7 @@ class Player:
 
             # 5b. CHECK IF USER IS ON ONE OF THE EDGES -> TRY TO ADD TRAIL TO EDGES
             if border.is_on_the_edges(self.x, self.y):
-                border.add_poly(self.trail, (self.x, self.y))
+                border.add_poly(self.trail, (self.x, self.y), keep_point)
                 self.dir = ""
                 return True
 
@@ -103,6 +101,27 @@ class Player:
             return True
         return False
 
+    def get_step_end(self, border, distance):
+        """
+        Walks a step one pixel at a time so that a long step cannot jump over an edge: stops before the first pixel
+        that is out of bounds, and on the first edge pixel reached from inside the field
+        :param border: Border object
+        :param distance: whole pixels to move in the current direction
+        :return: tuple where the step ends (the current position if not even one pixel is in bounds)
+        """
+        x, y = self.x, self.y
+        started_on_edges = None     # (only looked up if the step passes over an edge)
+        for i in range(distance):
+            if not border.is_valid_move(x + self.change_horizontal, y + self.change_vertical):
+                break
+            x, y = x + self.change_horizontal, y + self.change_vertical
+            if i < distance - 1 and border.is_on_the_edges(x, y):     # (the last pixel is checked by update_xy)
+                if started_on_edges is None:
+                    started_on_edges = border.is_on_the_edges(self.x, self.y)
+                if not started_on_edges:
+                    break
+        return x, y
+
     # ENEMY-RELATED METHODS #
 
     def check_collision(self, enemy, border, isSparc = False):
@@ -113,51 +132,80 @@ class Player:
         :param isSparc: True if enemy is a Sparc
         :return:
         """
-        # Part 1: CHECK FOR TRAIL COLLISION
-        if self.check_trail_collision(enemy.x, enemy.y, isSparc):
-            return True
+        return self.check_collisions([(enemy, isSparc)], border)
 
-        # PART 2: CHECK FOR DIRECT COLLISION
-        epsilon = 25
-        if abs(enemy.x - self.x) <= epsilon and abs(enemy.y - self.y) <= epsilon:
-            if isSparc:
-                enemy.teleport_me()
-            else:   # is Qix
-                enemy.choose_target(border, True)
-            pygame.time.delay(300)
-            self.reset_pos(not isSparc)
-            return True
+    def check_collisions(self, enemies, border):
+        """
+        Checks all enemies for a trail or direct collision in one pass (the line in progress is built only once).
+        Collisions are swept: the whole path each enemy moved along this tick is checked, so fast enemies (or long
+        ticks) cannot jump over the trail or the player.
+        :param enemies: list of (enemy, isSparc) tuples
+        :param border:
+        :return: True if any enemy collided with the player or the player's trail
+        """
+        open_line = None
+        if not self.trail.is_empty():
+            open_line = self.trail.get_open_line((self.x, self.y))
+
+        for enemy, isSparc in enemies:
+            path = enemy.get_path()
+            # Part 1: CHECK FOR TRAIL COLLISION
+            if self.check_trail_collision(enemy.x, enemy.y, isSparc, open_line, path):
+                return True
+
+            # PART 2: CHECK FOR DIRECT COLLISION
+            if self.is_hit_by(path):
+                if isSparc:
+                    enemy.teleport_me()
+                else:   # is Qix
+                    enemy.choose_target(border, True)
+                self.hit_pause = 0.3
+                self.reset_pos(not isSparc)
+                return True
         return False
 
-    def check_trail_collision(self, enemy_x, enemy_y, isSparc=False):
+    def check_trail_collision(self, enemy_x, enemy_y, isSparc=False, open_line=None, path=None):
         """
         Checks if the enemy has collided with the player's trail.
         :param enemy_x: x position
         :param enemy_y: y position
         :param isSparc: False if enemy is a Qix object
+        :param open_line: line the player is currently making (built from the trail if not given)
+        :param path: Line the enemy moved along this tick (see Qix.get_path); None to check only its position
         :return:
         """
         if self.trail.is_empty():  # Trail is empty -> Collision is impossible
             return False
 
-        # Part 1: CREATE NEW TRAIL THAT CONSIDERS THE LINE THAT THE PLAYER IS CURRENTLY MAKING
-        current_trail = Trail()
-        if len(self.trail) == 1:  # ---> Create current Line
-            current_line = Line(self.trail.get_first_point(), (self.x, self.y))
-        else:
-            current_line = Line(self.trail.get_last_line().endpoint1, (self.x, self.y))
-        current_trail.lines = self.trail.get_lines()[:-1] + [current_line]  # ---> Add modified lines to new trail
+        # Part 1: CONSIDER THE LINE THAT THE PLAYER IS CURRENTLY MAKING (committed lines + open line; nothing copied)
+        if open_line is None:
+            open_line = self.trail.get_open_line((self.x, self.y))
 
-        # Part 2: CHECK FOR TRAIL COLLISION
-        if current_trail.contains(enemy_x, enemy_y, 25, False):
+        # Part 2: CHECK FOR TRAIL COLLISION (exact: collision_epsilon is only for direct hits, see is_hit_by)
+        if path is not None:    # SWEPT: THE PATH AGAINST THE TRAIL WHEN THE TICK STARTED + ITS END AGAINST THE TRAIL NOW
+            start_line = Line(open_line.endpoint1, (self.last_x, self.last_y))
+            is_hit = (self.trail.contains_path_with(path, start_line) or open_line.contains((enemy_x, enemy_y)))
+        else:
+            is_hit = self.trail.contains_with(enemy_x, enemy_y, open_line)
+        if is_hit:
             if isSparc:
-                pygame.time.delay(200)
+                self.hit_pause = 0.2
                 self.reset_pos(False)
             else:  # is Qix
                 self.reset_pos(True, False)
             return True
         return False
 
+    def is_hit_by(self, path):
+        """
+        Checks for a direct collision over the whole tick: both moved in a straight line, so the enemy's path relative
+        to the player is also a line - a hit if it comes within collision_epsilon of the player (in x and in y)
+        :param path: Line the enemy moved along this tick (see Qix.get_path)
+        :return: True/False
+        """
+        relative_path = Line((path.x1() - self.last_x, path.y1() - self.last_y), (path.x2() - self.x, path.y2() - self.y))
+        return Line((0, 0), (0, 0)).contains_path(relative_path, self.collision_epsilon)
+
     def reset_pos(self, isQix=True, lose_life=True):
         """
         Handles player object after a collision - resets position, empties trail, decreases life, etc.
@@ -168,7 +216,7 @@ class Player:
         new_start_point = None
         if isQix:
             try:
-                new_start_point = deepcopy(self.trail.get_first_point())
+                new_start_point = self.trail.get_first_point()
                 self.x = new_start_point[0]
                 self.y = new_start_point[1]
             except:    # Invalid trail (ex. empty)
@@ -191,54 +239,41 @@ class Player:
         if self.dir != "HOR":
             self.trail.add_endpoint((self.x, self.y))
         self.dir = "HOR"
-        self.change_horizontal = -self.speed
+        self.change_horizontal = -1
         self.change_vertical = 0
 
     def change_right(self):
         if self.dir != "HOR":
             self.trail.add_endpoint((self.x, self.y))
         self.dir = "HOR"
-        self.change_horizontal = self.speed
+        self.change_horizontal = 1
         self.change_vertical = 0
 
     def change_up(self):
         if self.dir != "VER":
             self.trail.add_endpoint((self.x, self.y))
         self.dir = "VER"
-        self.change_vertical = -self.speed
+        self.change_vertical = -1
         self.change_horizontal = 0
 
     def change_down(self):
         if self.dir != "VER":
             self.trail.add_endpoint((self.x, self.y))
         self.dir = "VER"
-        self.change_vertical = self.speed
+        self.change_vertical = 1
         self.change_horizontal = 0
 
     def stop(self):
         self.change_horizontal = 0
         self.change_vertical = 0
 
-    # GRAPHIC METHODS #
-
-    def draw(self, screen, is_hit = False):
+    def update_hit(self, dt, is_hit=False):
         """
-        Draws player object on the screen.
+        Counts down the time the hit image is shown for.
+        :param dt: seconds of game time that passed
         :param is_hit: True if player has just experienced a collision
         """
         if is_hit:
-            self.is_hit = 301    # Will display alternate image for 300 milliseconds
-        if self.is_hit > 0:
-            self.is_hit -= 1
-            screen.blit(self.img_hit, (self.x - self.half, self.y - self.half))
+            self.hit_time = 0.3     # Will display alternate image for 300 milliseconds
         else:
-            screen.blit(self.img, (self.x - self.half, self.y - self.half))
-
-    def display_lives(self, screen, font):
-        """
-        Displays number of lives at the top-right corner of the game screen.
-        """
-        lives_text = font.render(self.get_lives_str(), True, Colour.pink, Colour.black)
-        lives_text_rect = lives_text.get_rect()
-        lives_text_rect.midright = (700, 50)
-        screen.blit(lives_text, lives_text_rect)
\ No newline at end of file
+            self.hit_time = max(self.hit_time - dt, 0)
@@ -0,0 +1,148 @@
+import csv
+import json
+import time
+from collections import deque
+
+
+class Profiler:
+    """
+    Per-frame phase timer: start_frame(), then start(phase) before each part of the frame (time accumulates per phase
+    if a phase runs more than once), then end_frame(). Keeps the last frames in a ring buffer.
+    Every method returns immediately while disabled.
+    """
+    def __init__(self, enabled=False, budget=1/60, capacity=3600):
+        """
+        :param enabled: False to record nothing
+        :param budget: seconds a frame may take before it is flagged as slow
+        :param capacity: number of frames (and slow frames) kept
+        """
+        self.enabled = enabled
+        self.budget = budget
+        self.phases = []                        # PHASE NAMES IN THE ORDER THEY WERE FIRST SEEN
+        self.frames = deque(maxlen=capacity)    # (frame number, total seconds, {phase: seconds})
+        self.slow_frames = deque(maxlen=capacity)   # (frame number, total seconds, heaviest phase, its seconds)
+        self.frame_count = 0
+
+        self.timings = {}           # PHASE TIMINGS OF THE CURRENT FRAME
+        self.frame_start = None
+        self.phase = None           # PHASE RUNNING RIGHT NOW
+        self.phase_start = 0
+
+    # MAIN METHODS #
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.timings = {}
+        self.phase = None
+        self.frame_start = time.perf_counter()
+
+    def start(self, phase):
+        """
+        Ends the running phase (if any) and starts timing the given one
+        :param phase: name (ex. "movement")
+        """
+        if not self.enabled or self.frame_start is None:
+            return
+        now = time.perf_counter()
+        self.stop_phase(now)
+        self.phase = phase
+        self.phase_start = now
+
+    def stop(self):
+        """
+        Ends the running phase (time until the next start() is not counted toward any phase)
+        """
+        if not self.enabled or self.frame_start is None:
+            return
+        self.stop_phase(time.perf_counter())
+
+    def end_frame(self):
+        """
+        Records the frame; flags it if it went over budget
+        """
+        if not self.enabled or self.frame_start is None:
+            return
+        now = time.perf_counter()
+        self.stop_phase(now)
+        total = now - self.frame_start
+        self.frame_start = None
+        self.frame_count += 1
+
+        self.frames.append((self.frame_count, total, self.timings))
+        if total > self.budget:
+            heaviest = max(self.timings, key=self.timings.get) if self.timings else None
+            self.slow_frames.append((self.frame_count, total, heaviest, self.timings.get(heaviest, 0)))
+
+    # REPORTS #
+
+    def get_report(self):
+        """
+        :return: dict (JSON-ready) of p50/p95/p99/mean per phase and for the whole frame (milliseconds), plus the
+                 slow frames with their heaviest phase
+        """
+        phases = {}
+        for phase in self.phases:
+            phases[phase] = Profiler.get_stats([timings.get(phase, 0) for _, _, timings in self.frames])
+        return {"frames": len(self.frames), "budget_ms": round(self.budget * 1000, 3),
+                "total": Profiler.get_stats([total for _, total, _ in self.frames]), "phases": phases,
+                "slow_frames": [{"frame": frame, "total_ms": round(total * 1000, 3), "heaviest": heaviest,
+                                 "heaviest_ms": round(seconds * 1000, 3)}
+                                for frame, total, heaviest, seconds in self.slow_frames]}
+
+    def print_report(self):
+        report = self.get_report()
+        print("%d frames, budget %.2f ms, %d over budget" % (report["frames"], report["budget_ms"],
+                                                              len(report["slow_frames"])))
+        print("    %-12s %9s %9s %9s %9s" % ("phase", "p50 ms", "p95 ms", "p99 ms", "mean ms"))
+        for name, stats in list(report["phases"].items()) + [("TOTAL", report["total"])]:
+            print("    %-12s %9.3f %9.3f %9.3f %9.3f" % (name, stats["p50_ms"], stats["p95_ms"], stats["p99_ms"],
+                                                       stats["mean_ms"]))
+        heaviest = {}
+        for slow in report["slow_frames"]:
+            heaviest[slow["heaviest"]] = heaviest.get(slow["heaviest"], 0) + 1
+        for name, count in sorted(heaviest.items(), key=lambda item: -item[1]):
+            print("    heaviest phase in %d slow frames: %s" % (count, name))
+
+    def dump(self, path):
+        """
+        Writes every recorded frame: CSV (one row per frame) if path ends in .csv, otherwise JSON (report + frames)
+        """
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["frame", "total_ms"] + self.phases)
+                for frame, total, timings in self.frames:
+                    writer.writerow([frame, round(total * 1000, 4)] +
+                                    [round(timings.get(phase, 0) * 1000, 4) for phase in self.phases])
+        else:
+            report = self.get_report()
+            report["frames_ms"] = [dict({"frame": frame, "total": round(total * 1000, 4)},
+                                        **{phase: round(seconds * 1000, 4) for phase, seconds in timings.items()})
+                                   for frame, total, timings in self.frames]
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+
+    # HELPER METHODS #
+
+    def stop_phase(self, now):
+        if self.phase is not None:
+            self.timings[self.phase] = self.timings.get(self.phase, 0) + now - self.phase_start
+            if self.phase not in self.phases:
+                self.phases.append(self.phase)
+            self.phase = None
+
+    def get_stats(values):  # static
+        """
+        :param values: list of seconds
+        :return: dict of p50/p95/p99/mean in milliseconds (nearest-rank percentiles)
+        """
+        if not values:
+            return {"p50_ms": 0, "p95_ms": 0, "p99_ms": 0, "mean_ms": 0}
+        ordered = sorted(values)
+        stats = {}
+        for percent in (50, 95, 99):
+            rank = max(-(-percent * len(ordered) // 100) - 1, 0)     # ceil(p% of n) - 1
+            stats["p%d_ms" % percent] = round(ordered[rank] * 1000, 4)
+        stats["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 4)
+        return stats
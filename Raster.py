@@ -0,0 +1,122 @@
+import numpy as np
+from Field import Field
+
+
+class Raster:
+    """
+    Occupancy bitmap of the grid (one uint8 per integer pixel, rows = y) for O(1) point queries; only exact for
+    rectilinear fields with integer corners (see is_exact)
+    """
+    CLAIMED, FIELD, EDGE = 0, 1, 2      # PIXEL VALUES (CLAIMED also covers everything outside the grid)
+
+    def __init__(self, left=100, top=100, right=700, bottom=700, mask=None):
+        """
+        :param mask: uint8 array of shape (height, width) to draw into (ex. a view into a stack of masks); None = a new one
+        """
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+        self.mask = mask if mask is not None else np.zeros((bottom - top + 1, right - left + 1), dtype=np.uint8)
+        self.is_exact = False   # False if the last field could not be rasterized (ex. a diagonal edge)
+
+    # ACCESSORS #
+
+    def get(self, x, y):
+        """
+        :param x: integer x coordinate
+        :param y: integer y coordinate
+        :return: pixel value (CLAIMED outside of the grid)
+        """
+        if self.left <= x <= self.right and self.top <= y <= self.bottom:
+            return self.mask[y - self.top, x - self.left]
+        return Raster.CLAIMED
+
+    def is_inside(self, x, y, buffer_amt=1):
+        """
+        Same answer as Border.is_valid_move for integer pixels:
+        buffer 1 = field or edge (or a claimed pixel pinched between them), buffer 0 = field only, buffer -1 = field pixel with no edge pixel next to it
+        :return: True/False
+        """
+        value = self.get(x, y)
+        if buffer_amt >= 1:
+            return value != Raster.CLAIMED or self.is_pinched(x, y)
+        if value != Raster.FIELD:
+            return False
+        if buffer_amt < 0:
+            return (self.get(x - 1, y) == Raster.FIELD and self.get(x + 1, y) == Raster.FIELD and
+                    self.get(x, y - 1) == Raster.FIELD and self.get(x, y + 1) == Raster.FIELD)
+        return True
+
+    def is_pinched(self, x, y):
+        """
+        Checks if a claimed pixel is squeezed between field pixels on two opposite sides (ex. a 2 pixel wide notch cut by
+        a capture): the field buffered by 1 covers it from both sides
+        :return: True/False
+        """
+        left_right = all(self.get(x + dx, y + dy) != Raster.CLAIMED for dx in (-1, 1) for dy in (-1, 0, 1))
+        return left_right or all(self.get(x + dx, y + dy) != Raster.CLAIMED for dy in (-1, 1) for dx in (-1, 0, 1))
+
+    def get_rgb(self, colours):
+        """
+        Colours the mask (ex. to blit it as the board image)
+        :param colours: dict of pixel value -> (r, g, b)
+        :return: array of shape (width, height, 3) - x first, as pygame.surfarray expects
+        """
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        for value, colour in colours.items():
+            palette[value] = colour
+        return palette[self.mask.T]
+
+    # MUTATORS #
+
+    def build(self, points):
+        """
+        Rasterizes the whole field from scratch
+        :param points: list of tuples (edge points)
+        """
+        self.mask[:] = Raster.CLAIMED
+        self.is_exact = self.fill(points, Raster.FIELD)
+        if self.is_exact:
+            self.draw_ring(points, Raster.EDGE)
+
+    def claim(self, points, claimed):
+        """
+        Updates the mask after a capture: scan-fills only the claimed regions, then redraws the new edges
+        :param points: list of tuples (new edge points)
+        :param claimed: list of point lists (regions removed from the field)
+        """
+        if not self.is_exact:
+            self.build(points)
+            return
+        for region in claimed:
+            if not self.fill(region, Raster.CLAIMED):
+                self.build(points)
+                return
+        self.draw_ring(points, Raster.EDGE)
+
+    # HELPER METHODS #
+
+    def fill(self, points, value):
+        """
+        Scan-fills a rectilinear polygon (edges included) slab by slab
+        :return: False if the polygon is not rectilinear (nothing is filled)
+        """
+        field = Field(points)
+        if not field.is_rectilinear:
+            return False
+        for left, top, right, bottom in field.rectangles:
+            self.mask[top - self.top:bottom - self.top + 1, left - self.left:right - self.left + 1] = value
+        return True
+
+    def draw_ring(self, points, value):
+        for i in range(len(points)):
+            self.draw_line(points[i - 1], points[i], value)
+
+    def draw_line(self, point1, point2, value):
+        """
+        Sets every pixel of a horizontal/vertical line
+        """
+        (x1, y1), (x2, y2) = point1, point2
+        self.mask[min(y1, y2) - self.top:max(y1, y2) - self.top + 1,
+                  min(x1, x2) - self.left:max(x1, x2) - self.left + 1] = value
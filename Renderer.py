@@ -0,0 +1,139 @@
+import pygame
+from Graphic import Colour
+from Assets import Assets
+from Raster import Raster
+from Profiler import Profiler
+
+
+class Renderer:
+    """
+    Draws a GameState on the screen (only reads the state - never changes it)
+    """
+    def __init__(self, screen, font, profiler=None):
+        """
+        :param profiler: Profiler object that times the phases of draw(); None for a disabled one
+        """
+        self.screen = screen
+        self.font = font
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.half = 50//2   # PNG DIMENSIONS
+
+        self.player_image = Assets.get_image("icon00.png")
+        self.player_hit_image = Assets.get_image("icon01.png")
+        self.qix_image = Assets.get_image("icon10.png")
+        self.sparx_image = Assets.get_image("icon20.png")
+
+        self.board = None           # PRE-RENDERED BOARD (see get_board)
+        self.board_version = None   # BORDER VERSION OF self.board
+        self.screen_version = None  # BORDER VERSION CURRENTLY ON SCREEN (None = redraw the whole board)
+        self.dirty_rects = []       # RECTS DRAWN OVER THE BOARD LAST FRAME
+        self.texts = {}             # (text, colour) -> rendered text
+
+    # MAIN METHODS #
+
+    def draw(self, state):
+        """
+        Draws one frame: restores the board under last frame's sprites, draws everything on top and pushes only the
+        changed parts of the screen to the display
+        :param state: GameState object
+        """
+        profiler = self.profiler
+        profiler.start("board")
+        restored_rects = self.draw_board(state.border)
+
+        profiler.start("sprites")
+        player = state.player
+        drawn_rects = self.draw_trail(player.get_trail(), (player.x, player.y))
+        drawn_rects.append(self.draw_sprite(self.qix_image, state.qix))
+        if state.level == 2:
+            drawn_rects.append(self.draw_sprite(self.sparx_image, state.sparx))
+        player_image = self.player_hit_image if player.hit_time > 0 else self.player_image
+        drawn_rects.append(self.draw_sprite(player_image, player))
+
+        profiler.start("hud")
+        drawn_rects.append(self.draw_text(player.get_lives_str(), Colour.pink, midright=(700, 50)))   # LIVES
+        drawn_rects.append(self.draw_text(state.border.get_score() + " percent", Colour.white, midleft=(100, 50)))
+
+        profiler.start("display")
+        if restored_rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(restored_rects + drawn_rects)
+        self.dirty_rects = drawn_rects
+        profiler.stop()
+
+    def draw_screen_image(self, image_name):
+        """
+        Draws a full-screen image (ex. start/level/end screens)
+        """
+        self.screen.blit(Assets.get_screen(image_name), (0, 0))   # decoded + scaled once (see Assets)
+        pygame.display.update()
+        self.screen_version = None  # Board must be fully redrawn when the game screen comes back
+
+    # HELPER METHODS #
+
+    def draw_board(self, border):
+        """
+        Restores the pre-rendered board under everything drawn last frame; redraws all of it if the board changed
+        :return: list of Rects that were restored; None if the whole board was redrawn
+        """
+        board = self.get_board(border)
+        if self.screen_version != border.version:
+            self.screen_version = border.version
+            self.screen.blit(board, (0, 0))
+            return None
+        for rect in self.dirty_rects:
+            self.screen.blit(board, rect, rect)
+        return self.dirty_rects
+
+    def get_board(self, border):
+        """
+        Gets the pre-rendered board (background, eaten area, remaining area, gridlines) - rebuilt only after a capture
+        :return: Surface
+        """
+        if self.board is None or self.board_version != border.version:
+            self.board = pygame.Surface(self.screen.get_size())
+            self.board.fill(Colour.black)
+            raster = border.raster
+            if raster is not None and raster.is_exact:     # BLIT THE OCCUPANCY MASK (eaten + remaining area)
+                colours = {Raster.CLAIMED: Colour.white, Raster.FIELD: Colour.purple, Raster.EDGE: Colour.purple}
+                self.board.blit(pygame.surfarray.make_surface(raster.get_rgb(colours)), (raster.left, raster.top))
+            else:
+                pygame.draw.polygon(self.board, Colour.white, border.get_init_grid())     # EATEN AREA
+
+                pygame.draw.polygon(self.board, Colour.purple, border.get_edge_points())  # REMAINING AREA (boundaries)
+
+            for gridline in border.get_init_gridlines():    # 4 SIDES OF THE GRID
+                self.draw_line(self.board, gridline, Colour.white)
+            self.board_version = border.version
+        return self.board
+
+    def draw_trail(self, trail, endpoint):
+        """
+        :param endpoint: player's current coordinate (line still in progress; not yet added to the trail)
+        :return: list of Rects that were drawn
+        """
+        rects = []
+        for line in trail.get_lines():
+            if line.endpoint2 is None:
+                line = trail.get_open_line(endpoint)
+            rects.append(self.draw_line(self.screen, line))
+        return rects
+
+    def draw_line(self, surface, line, colour=Colour.blue, thickness=5):
+        return pygame.draw.line(surface, colour, line.endpoint1, line.endpoint2, thickness)
+
+    def draw_sprite(self, image, entity):
+        return self.screen.blit(image, (entity.x - self.half, entity.y - self.half))
+
+    def draw_text(self, text, colour, **position):
+        """
+        Draws text (rendered only the first time it is shown) with the given rect position (ex. midleft=(100, 50))
+        :return: Rect that was drawn
+        """
+        rendered = self.texts.get((text, colour))
+        if rendered is None:
+            rendered = self.font.render(text, True, colour, Colour.black)
+            self.texts[(text, colour)] = rendered
+        rect = rendered.get_rect(**position)
+        return self.screen.blit(rendered, rect)
@@ -0,0 +1,126 @@
+import argparse
+import json
+import time
+from Batch import ScriptedPlayer
+from Game import GameState
+from Player import Player
+
+
+class Replay:
+    """
+    Seed + per-tick input log of a game: enough to replay it exactly (headless, as fast as possible)
+    """
+    CODES = {Player.UP: "U", Player.DOWN: "D", Player.LEFT: "L", Player.RIGHT: "R",   # ONE LETTER PER ACTION
+             Player.TELEPORT: "T", Player.STOP: "S", GameState.QUIT: "Q"}
+    ACTIONS = {code: action for action, code in CODES.items()}
+
+    def __init__(self, seed, inputs=None, ticks=0, state_hash=None):
+        """
+        :param seed: seed of the game (see GameState)
+        :param inputs: dict of tick -> string of action codes (only ticks that had inputs)
+        :param ticks: number of ticks the game ran for
+        :param state_hash: GameState.get_hash() at the end of the game
+        """
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else {}
+        self.ticks = ticks
+        self.state_hash = state_hash
+
+    # RECORDING #
+
+    def record(self, tick, inputs):
+        """
+        Logs the inputs of one tick (call before GameState.step)
+        :param tick: GameState.ticks before the step
+        :param inputs: list of actions
+        """
+        if inputs:
+            self.inputs[tick] = self.inputs.get(tick, "") + "".join(Replay.CODES[action] for action in inputs)
+
+    def finish(self, state):
+        """
+        Stores the length and the final hash of the recorded game
+        :param state: GameState object that was recorded
+        """
+        self.ticks = state.ticks
+        self.state_hash = state.get_hash()
+
+    # PLAYBACK #
+
+    def play(self):
+        """
+        Replays the game headless (no rendering, no waiting)
+        :return: GameState object at the end of the game
+        """
+        state = GameState(seed=self.seed)
+        while state.ticks < self.ticks and not state.is_over():
+            tick = state.ticks
+            state.step([Replay.ACTIONS[code] for code in self.inputs.get(tick, "")])
+        return state
+
+    def verify(self):
+        """
+        Replays the game and checks that it ends in the recorded state
+        :return: (True if the final hashes match, final GameState object)
+        """
+        state = self.play()
+        return state.ticks == self.ticks and state.get_hash() == self.state_hash, state
+
+    # FILES #
+
+    def save(self, path):
+        data = {"seed": self.seed, "tick_rate": GameState.TICK_RATE, "ticks": self.ticks, "hash": self.state_hash,
+                "inputs": [[tick, codes] for tick, codes in sorted(self.inputs.items())]}
+        with open(path, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+
+    def load(path):  # static
+        """
+        :return: Replay object saved with save()
+        """
+        with open(path) as file:
+            data = json.load(file)
+        if data.get("tick_rate", GameState.TICK_RATE) != GameState.TICK_RATE:
+            raise ValueError("replay was recorded at %s ticks per second (game runs at %s)"
+                             % (data["tick_rate"], GameState.TICK_RATE))
+        return Replay(data["seed"], {tick: codes for tick, codes in data["inputs"]}, data["ticks"], data["hash"])
+
+    def make_scripted(seed, ticks, change_every=40):  # static
+        """
+        Records a headless game driven by a ScriptedPlayer (ex. to make a regression fixture without playing)
+        :param change_every: average ticks between two key presses
+        :return: finished Replay object
+        """
+        script = ScriptedPlayer(seed, change_every)
+        replay = Replay(seed)
+        state = GameState(seed=seed)
+        while state.ticks < ticks and not state.is_over():
+            inputs = script.get_inputs(state)
+            replay.record(state.ticks, inputs)
+            state.step(inputs)
+        replay.finish(state)
+        return replay
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded games headless and check their final state")
+    parser.add_argument("replays", nargs="*", help="replay files (ex. from main.py --record)")
+    parser.add_argument("--make", help="record a scripted game to this file instead")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the scripted game")
+    parser.add_argument("--ticks", type=int, default=20000, help="length of the scripted game")
+    args = parser.parse_args()
+
+    if args.make:
+        Replay.make_scripted(args.seed, args.ticks).save(args.make)
+    failed = False
+    for path in args.replays + ([args.make] if args.make else []):
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        matches, final_state = replay.verify()
+        seconds = time.perf_counter() - start
+        print("%s: %s  %d ticks in %.2f s (%.0f ticks/s)  hash %s" % (
+            path, "OK" if matches else "MISMATCH", final_state.ticks, seconds, final_state.ticks / max(seconds, 1e-9),
+            final_state.get_hash()))
+        failed = failed or not matches
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,154 @@
+from bisect import bisect_left, bisect_right
+
+
+class ScanlineIndex:
+    """
+    Interval tables of a rectilinear field, built once per capture from the Field slabs:
+    inside intervals per slab (between consecutive vertex rows), plus the horizontal edges of every row and the
+    vertical edges of every column (sorted, merged) - point queries bisect one row instead of touching Shapely
+    """
+    def __init__(self, points, field):
+        """
+        :param points: list of tuples (rectilinear edge points)
+        :param field: Field object of the same points
+        """
+        self.rows = []              # y OF EVERY SLAB BOUNDARY (sorted)
+        self.slabs = []             # slab i (rows[i] < y < rows[i+1]) -> sorted list of inside intervals (left, right)
+        self.slab_lefts = []        # slab i -> lefts of its intervals (for bisect)
+        self.build_slabs(field.rectangles)
+
+        self.horizontals = ScanlineIndex.get_edge_table(points, 1)     # y -> sorted merged (x_low, x_high)
+        self.verticals = ScanlineIndex.get_edge_table(points, 0)       # x -> sorted merged (y_low, y_high)
+        self.horizontal_rows = sorted(self.horizontals)
+        self.vertical_columns = sorted(self.verticals)
+
+    # MAIN METHODS #
+
+    def is_valid_move(self, x, y, buffer_amt=1):
+        """
+        Same answer as Border.is_valid_move (point strictly inside the field grown/shrunk by buffer_amt), with exact
+        distances instead of Shapely's segmented round corners
+        :return: True/False
+        """
+        location = self.locate(x, y)
+        if buffer_amt > 0:
+            if location >= 0:
+                return True
+            distance = self.get_distance_to_edges(x, y, buffer_amt)
+            return distance < buffer_amt or (distance == buffer_amt and self.is_pinched(x, y, buffer_amt))
+        if buffer_amt == 0 or location <= 0:
+            return location > 0
+        return self.get_distance_to_edges(x, y, -buffer_amt) > -buffer_amt
+
+    def is_on_the_edges(self, x, y, epsilon=0):
+        """
+        Same answer as Border.is_on_the_edges: the point is within epsilon of an edge (in x and in y)
+        :return: True/False
+        """
+        return (ScanlineIndex.is_near_table(self.horizontals, self.horizontal_rows, y, x, epsilon) or
+                ScanlineIndex.is_near_table(self.verticals, self.vertical_columns, x, y, epsilon))
+
+    # HELPER METHODS #
+
+    def locate(self, x, y):
+        """
+        :return: 1 if the point is strictly inside the field, 0 if it is on the edges, -1 if it is outside
+        """
+        if not self.rows or not self.rows[0] <= y <= self.rows[-1]:
+            return -1
+        if ScanlineIndex.is_near_table(self.horizontals, self.horizontal_rows, y, x, 0):
+            return 0
+        if y == self.rows[0] or y == self.rows[-1]:
+            return -1   # first/last row: only the horizontal edges are in the field
+        i = bisect_right(self.rows, y) - 1         # slab that starts at or above y (same intervals off the edges)
+        j = bisect_right(self.slab_lefts[i], x) - 1
+        if j < 0:
+            return -1
+        left, right = self.slabs[i][j]
+        if x == left or x == right:
+            return 0
+        return 1 if x < right else -1
+
+    def get_distance_to_edges(self, x, y, limit):
+        """
+        Distance from the point to the nearest edge, looking only at edges within limit (in x or y)
+        :return: number; limit + 1 if no edge is that close
+        """
+        best = limit + 1
+        for table, lines, position, along in ((self.horizontals, self.horizontal_rows, y, x),
+                                              (self.verticals, self.vertical_columns, x, y)):
+            for k in range(bisect_left(lines, position - limit), bisect_right(lines, position + limit)):
+                line = lines[k]
+                for low, high in ScanlineIndex.get_nearest_intervals(table[line], along):
+                    gap = max(low - along, along - high, 0)
+                    best = min(best, (gap * gap + (line - position)**2)**0.5)
+        return best
+
+    def is_pinched(self, x, y, distance):
+        """
+        Checks if an outside point is exactly distance away from edges on two opposite sides (ex. a notch that is
+        2*distance wide): the buffered field covers it from both sides
+        :return: True/False
+        """
+        for table, position, along in ((self.verticals, x, y), (self.horizontals, y, x)):
+            first, second = table.get(position - distance, ()), table.get(position + distance, ())
+            if any(low < along < high for low, high in first) and any(low < along < high for low, high in second):
+                return True
+        return False
+
+    def build_slabs(self, rectangles):
+        """
+        Groups the Field rectangles (ordered slab by slab, left to right) into one interval list per slab
+        """
+        for left, top, right, bottom in rectangles:
+            if not self.rows:
+                self.rows.append(top)
+            if self.rows[-1] != bottom:     # FIRST RECTANGLE OF A NEW SLAB
+                self.rows.append(bottom)
+                self.slabs.append([])
+                self.slab_lefts.append([])
+            self.slabs[-1].append((left, right))
+            self.slab_lefts[-1].append(left)
+
+    def is_near_table(table, lines, position, along, epsilon):  # static
+        """
+        :param table: dict of line position -> sorted merged intervals (ex. horizontals: y -> (x_low, x_high))
+        :param lines: sorted keys of table
+        :return: True if an interval of a line within epsilon of position reaches within epsilon of along
+        """
+        for k in range(bisect_left(lines, position - epsilon), bisect_right(lines, position + epsilon)):
+            for low, high in ScanlineIndex.get_nearest_intervals(table[lines[k]], along):
+                if low - epsilon <= along <= high + epsilon:
+                    return True
+        return False
+
+    def get_nearest_intervals(intervals, along):  # static
+        """
+        :param intervals: sorted, non-overlapping list of (low, high)
+        :return: the intervals just before and just after along (the only ones that can be nearest to it)
+        """
+        j = bisect_right(intervals, (along, float("inf")))
+        return intervals[max(j - 1, 0):j + 1]
+
+    def get_edge_table(points, axis):  # static
+        """
+        Collects the edges that run along the given axis (1 = horizontal: same y; 0 = vertical: same x)
+        :return: dict of line position -> sorted list of merged (low, high) intervals
+        """
+        other = 1 - axis
+        table = {}
+        for i in range(len(points)):
+            point1, point2 = points[i - 1], points[i]
+            if point1[axis] == point2[axis]:
+                low, high = sorted((point1[other], point2[other]))
+                table.setdefault(point1[axis], []).append((low, high))
+        for line, intervals in table.items():
+            intervals.sort()
+            merged = [intervals[0]]
+            for low, high in intervals[1:]:
+                if low <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+                else:
+                    merged.append((low, high))
+            table[line] = merged
+        return table
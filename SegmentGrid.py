@@ -0,0 +1,68 @@
+class SegmentGrid:
+    """
+    Uniform-grid spatial hash of line segments: each segment is stored in every cell that its bounding box touches
+    """
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.cells = {}         # (column, row) -> set of segment indices
+        self.segments = {}      # segment index -> list of (column, row) it was stored in
+
+    # MUTATORS #
+
+    def insert(self, index, line):
+        """
+        Stores the segment under the given index (replacing whatever was stored there)
+        :param index: key of the segment (ex. its position in Trail.lines)
+        :param line: Line object; lines that are still in progress (endpoint2 is None) are not stored
+        """
+        self.remove(index)
+        if line.endpoint2 is None:
+            return
+        keys = self.get_keys(min(line.x1(), line.x2()), min(line.y1(), line.y2()),
+                             max(line.x1(), line.x2()), max(line.y1(), line.y2()))
+        for key in keys:
+            self.cells.setdefault(key, set()).add(index)
+        self.segments[index] = keys
+
+    def remove(self, index):
+        for key in self.segments.pop(index, ()):
+            cell = self.cells[key]
+            cell.discard(index)
+            if not cell:
+                del self.cells[key]
+
+    def clear(self):
+        self.cells = {}
+        self.segments = {}
+
+    # QUERIES #
+
+    def query(self, x, y, epsilon=0):
+        """
+        Finds the segments that may be within epsilon of the given point (only nearby cells are visited)
+        :return: set of segment indices (candidates - still need an exact check)
+        """
+        return self.query_box(x - epsilon, y - epsilon, x + epsilon, y + epsilon)
+
+    def query_box(self, left, top, right, bottom):
+        """
+        Finds the segments that may overlap the given box (ex. everything near a path)
+        :return: set of segment indices (candidates - still need an exact check)
+        """
+        candidates = set()
+        for key in self.get_keys(left, top, right, bottom):
+            cell = self.cells.get(key)
+            if cell:
+                candidates |= cell
+        return candidates
+
+    # HELPER METHODS #
+
+    def get_keys(self, left, top, right, bottom):
+        """
+        :return: list of (column, row) of every cell that overlaps the given box
+        """
+        size = self.cell_size
+        return [(column, row)
+                for column in range(int(left // size), int(right // size) + 1)
+                for row in range(int(top // size), int(bottom // size) + 1)]
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class SegmentArray:
+    """
+    Structure-of-arrays store of line segments (x1, y1, x2, y2 as contiguous NumPy arrays) for queries that check every
+    segment in one vectorized call. Lines that are still in progress (endpoint2 is None) are stored as NaN and never
+    match a query.
+    """
+    def __init__(self, lines=(), capacity=16):
+        coordinates = np.full((max(capacity, len(lines)), 4), np.nan)
+        if len(lines) > 0:
+            coordinates[:len(lines)] = [(*line.endpoint1, *(line.endpoint2 or (np.nan, np.nan))) for line in lines]
+        self.x1, self.y1, self.x2, self.y2 = [np.ascontiguousarray(column) for column in coordinates.T]
+        self.count = len(lines)
+
+    # MUTATORS #
+
+    def append(self, line):
+        if self.count == len(self.x1):      # FULL: double the capacity
+            self.x1, self.y1, self.x2, self.y2 = [np.concatenate((array, np.full(len(array), np.nan)))
+                                                  for array in (self.x1, self.y1, self.x2, self.y2)]
+        self.count += 1
+        self.set(self.count - 1, line)
+
+    def set(self, index, line):
+        self.x1[index], self.y1[index] = line.endpoint1
+        if line.endpoint2 is None:
+            self.x2[index] = self.y2[index] = np.nan
+        else:
+            self.x2[index], self.y2[index] = line.endpoint2
+
+    def truncate(self, count):
+        """
+        Drops every segment from index count onwards
+        """
+        self.count = min(count, self.count)
+
+    # QUERIES #
+
+    def contains(self, x, y, epsilon=0):
+        """
+        Vectorized Line.contains: checks the point against every segment's bounds (exact for horizontal/vertical lines)
+        :return: boolean array (one entry per segment)
+        """
+        n = self.count
+        x1, y1, x2, y2 = self.x1[:n], self.y1[:n], self.x2[:n], self.y2[:n]
+        return ((np.minimum(x1, x2) - epsilon <= x) & (x <= np.maximum(x1, x2) + epsilon) &
+                (np.minimum(y1, y2) - epsilon <= y) & (y <= np.maximum(y1, y2) + epsilon))
+
+    def index_of(self, x, y, epsilon=0):
+        """
+        Finds the first segment that contains the point
+        :return: index (integer); None if no segment contains the point
+        """
+        return SegmentArray.first_index(self.contains(x, y, epsilon))
+
+    # HELPER METHODS #
+
+    def first_index(mask):  # static
+        """
+        :param mask: boolean array
+        :return: first True index of mask; None if there is none
+        """
+        indices = np.flatnonzero(mask)
+        return int(indices[0]) if len(indices) > 0 else None
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,233 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+from Border import Border
+from Enemy import Sparx
+from Game import GameState
+from Line import Trail
+from Player import Player
+
+# ================
+#   BOARD STATES
+# ================
+
+def make_comb_points(claimed, teeth=50, left=100, top=100, size=600):
+    """
+    Builds a rectilinear field shaped like a comb (a bar along the top with teeth hanging down) such that
+    roughly the given fraction of the grid is claimed
+    :param claimed: fraction of the grid that has been claimed (0.0 - 1.0)
+    :param teeth: number of teeth (each tooth adds 4 vertices)
+    :return: list of tuples
+    """
+    tooth_width = size // (2 * teeth)
+    teeth_area = teeth * tooth_width                    # area per pixel of tooth depth
+    remaining = (1 - claimed) * size * size
+
+    bar = 20
+    depth = round((remaining - size * bar) / teeth_area)
+    if depth > size - bar:                              # big field: full-depth teeth, taller bar
+        bar = round((remaining - teeth_area * size) / (size - teeth_area))
+        depth = size - bar
+    depth = max(depth, 1)
+
+    bar_y = top + bar
+    tooth_y = bar_y + depth
+    points = [(left, top), (left + size, top), (left + size, bar_y)]
+    for i in range(teeth - 1, -1, -1):
+        x = left + 2 * tooth_width * i
+        points += [(x + tooth_width, bar_y), (x + tooth_width, tooth_y), (x, tooth_y)]
+        if i > 0:
+            points.append((x, bar_y))
+    return points
+
+def make_border(claimed, teeth=50, raster=False):
+    border = Border(raster)
+    if claimed > 0:
+        border.set_edge_points(make_comb_points(claimed, teeth))
+    return border
+
+def make_staircase_trail(start, segments, step=4, finished=False):
+    """
+    Builds a trail that alternates right and down moves (like a player drawing a long staircase)
+    :param finished: True to close the last line (as add_poly does before fix_trail)
+    :return: Trail object (its last line is still in progress unless finished)
+    """
+    trail = Trail()
+    x, y = start
+    trail.add_endpoint((x, y))
+    for i in range(segments):
+        if i % 2 == 0:
+            x += step
+        else:
+            y += step
+        trail.add_endpoint((x, y))
+    if finished:
+        trail.set_last_point((x, y))
+    return trail
+
+def make_capture(claimed, teeth=50):
+    """
+    Builds a board and a trail that cuts straight down from the top edge through the field
+    :return: (border, trail, endpoint) ready for border.add_poly(trail, endpoint)
+    """
+    border = make_border(claimed, teeth)
+    x = 400
+    if claimed > 0:
+        tooth_width = 600 // (2 * teeth)
+        x = 100 + tooth_width + tooth_width // 2    # middle of the first gap between two teeth
+    y = 101
+    while not border.is_on_the_edges(x, y):
+        y += 1
+    trail = Trail()
+    trail.add_endpoint((x, 100))
+    trail.add_endpoint((x, 100))                    # Player adds a point when it starts moving
+    return border, trail, (x, y)
+
+STATES = {"fresh": 0.0, "claimed40": 0.40, "claimed74": 0.74}
+
+# ==============
+#   BENCHMARKS
+# ==============
+
+def time_calls(function, arguments, rounds=5):
+    """
+    Times function over every item of arguments, several rounds
+    :return: dict of per-call timings in microseconds (best round and median round)
+    """
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for argument in arguments:
+            function(*argument)
+        per_call.append((time.perf_counter() - start) / len(arguments) * 1e6)
+    per_call.sort()
+    return {"best_us": round(per_call[0], 3), "median_us": round(per_call[len(per_call) // 2], 3),
+            "calls": len(arguments)}
+
+def time_setup_calls(make_arguments, function, count, rounds=5):
+    """
+    Like time_calls, but builds fresh arguments before each round (for calls that mutate their arguments)
+    """
+    per_call = []
+    for _ in range(rounds):
+        arguments = [make_arguments() for _ in range(count)]
+        start = time.perf_counter()
+        for argument in arguments:
+            function(*argument)
+        per_call.append((time.perf_counter() - start) / count * 1e6)
+    per_call.sort()
+    return {"best_us": round(per_call[0], 3), "median_us": round(per_call[len(per_call) // 2], 3), "calls": count}
+
+def bench_state(claimed, count, rng):
+    """
+    Times the Border, Trail and Player hot paths on one board state
+    :return: dict of benchmark name -> timings
+    """
+    border = make_border(claimed)
+    points = [(rng.randrange(100, 701), rng.randrange(100, 701)) for _ in range(count)]
+    sparx_points = [(border.get_valid_position_sparx(),) for _ in range(count)]
+    border.is_valid_move(400, 400)                  # warm the caches (as after the first frame)
+    sparx = Sparx(rng)
+    sparx.move(border, GameState.TICK)              # maps the Sparc onto the perimeter once (as on its first tick)
+
+    raster_border = make_border(claimed, raster=True)
+
+    trail = make_staircase_trail((100, 400), 300)
+    trail_points = [(rng.randrange(100, 701), rng.randrange(100, 701), 25) for _ in range(count)]
+
+    player = Player()
+    player.trail = make_staircase_trail((100, 400), 300)
+    player.x, player.y = player.trail.get_last_line().endpoint1
+    far_points = [(x, y, False) for x, y, _ in trail_points
+                  if not player.trail.contains_with(x, y, player.trail.get_open_line((player.x, player.y)), 25)]
+
+    return {
+        "Border.is_valid_move": time_calls(border.is_valid_move, points),
+        "Border.is_valid_move (raster)": time_calls(raster_border.is_valid_move, points),
+        "Border.add_poly": time_setup_calls(lambda: make_capture(claimed), Border.add_poly, max(count // 50, 5)),
+        "Sparx.move": time_calls(sparx.move, [(border, GameState.TICK)] * count),
+        "Border.get_valid_position": time_calls(border.get_valid_position, [()] * count),
+        "Border.get_valid_position_sparx": time_calls(border.get_valid_position_sparx, [()] * count),
+        "Border.is_on_the_edges": time_calls(border.is_on_the_edges, [point for point, in sparx_points]),
+        "Border.is_on_the_edges (raster)": time_calls(raster_border.is_on_the_edges, [point for point, in sparx_points]),
+        "Border.get_score": time_calls(border.get_score, [()] * count),
+        "Trail.contains": time_calls(trail.contains, trail_points),
+        "Trail.fix_trail": time_setup_calls(lambda: (make_staircase_trail((100, 400), 300, finished=True),), Trail.fix_trail,
+                                            max(count // 100, 5)),
+        "Player.check_trail_collision": time_calls(player.check_trail_collision, far_points),
+    }
+
+def run(count=1000, seed=0):
+    """
+    Runs every benchmark on every board state
+    :return: dict (JSON-ready) with the results and where they came from
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    results = {}
+    for name, claimed in STATES.items():
+        results[name] = bench_state(claimed, count, rng)
+        results[name]["vertices"] = len(make_border(claimed).get_edge_points())
+    return {"commit": get_commit(), "python": platform.python_version(), "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "seed": seed, "results": results}
+
+# ===========
+#   REPORTS
+# ===========
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def print_report(report, baseline=None):
+    """
+    Prints the results (and the ratio to a baseline report, if given: > 1.0 means slower than the baseline)
+    """
+    for state, results in report["results"].items():
+        print("%s (%d vertices)" % (state, results["vertices"]))
+        for name, timing in results.items():
+            if name == "vertices":
+                continue
+            line = "    %-34s %12.2f us" % (name, timing["median_us"])
+            if baseline is not None and name in baseline["results"].get(state, {}):
+                line += "   x%.2f" % (timing["median_us"] / max(baseline["results"][state][name]["median_us"], 1e-9))
+            print(line)
+
+def bench_valid_position(claimed_levels=(0.0, 0.25, 0.5, 0.75, 0.9, 0.95), count=200):
+    """
+    Times Border.get_valid_position (area-weighted sampling) against plain rejection sampling as the board fills up
+    """
+    print("claimed   sampled (us)   rejection (us)")
+    for claimed in claimed_levels:
+        border = make_border(claimed)
+        border.get_valid_position()     # build the cached geometry outside of the timed loop
+        sampled = time_calls(border.get_valid_position, [()] * count)
+        rejection = time_calls(border.get_valid_position_by_rejection, [()] * (count // 10 or 1))
+        print("%5s%%   %12.1f   %14.1f" % (border.get_score(), sampled["median_us"], rejection["median_us"]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the Border/Trail/Player hot paths")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--count", type=int, default=1000, help="calls per benchmark round")
+    parser.add_argument("--sampling", action="store_true", help="only run the get_valid_position sweep")
+    args = parser.parse_args()
+
+    if args.sampling:
+        random.seed(0)
+        bench_valid_position()
+    else:
+        report = run(args.count)
+        baseline = None
+        if args.compare:
+            with open(args.compare) as file:
+                baseline = json.load(file)
+        print_report(report, baseline)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(report, file, indent=2)
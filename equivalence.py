@@ -0,0 +1,161 @@
+import argparse
+import random
+import sys
+from collections import Counter
+from shapely.geometry import Polygon, Point
+try:
+    from shapely import contains_xy
+except ImportError:
+    contains_xy = None
+from Batch import ScriptedPlayer
+from Border import Border
+from Game import GameState
+from benchmark import make_border, STATES
+
+# ======================
+#   REFERENCE QUERIES
+# ======================
+
+# (the plain Shapely/segment answers that the raster and scanline fast paths of Border must reproduce)
+
+def reference_is_valid_move(border, x, y, buffer_amt=1):
+    field = border.get_prepared_field(buffer_amt)
+    if contains_xy is not None:
+        return bool(contains_xy(field, x, y))
+    return field.contains(Point(x, y))
+
+def reference_is_on_the_edges(border, x, y, epsilon=0):
+    return border.get_segments().index_of(x, y, epsilon) is not None
+
+# ==========
+#   CHECKS
+# ==========
+
+SCANLINE_BUFFERS = (-3, -1, 0, 1, 2)    # is_valid_move buffer_amt values answered by the scanline index
+RASTER_BUFFERS = (-1, 0, 1)             # is_valid_move buffer_amt values answered by the raster
+EPSILONS = (0, 1, 25)                   # is_on_the_edges epsilon values answered by the scanline index
+
+def get_query_points(border, count, rng):
+    """
+    :return: list of integer points: count random ones over (and just outside) the grid + every pixel near a vertex
+    """
+    points = [(rng.randrange(95, 706), rng.randrange(95, 706)) for _ in range(count)]
+    for x, y in border.get_edge_points():
+        points += [(x + dx, y + dy) for dx in range(-3, 4) for dy in range(-3, 4)]
+    return points
+
+def compare_queries(border, raster_border, points, mismatches):
+    """
+    Counts the points where the scanline (border) or raster (raster_border) answer differs from the reference
+    :param border: Border object without a raster (rectilinear field, so the scanline index is used)
+    :param raster_border: Border object with a raster and the same edge points
+    :param mismatches: Counter of check name -> mismatches (updated)
+    :return: number of checks
+    """
+    checks = 0
+    for x, y in points:
+        for buffer_amt in SCANLINE_BUFFERS:
+            expected = reference_is_valid_move(border, x, y, buffer_amt)
+            mismatches["scanline is_valid_move(buffer %d)" % buffer_amt] += border.is_valid_move(x, y, buffer_amt) != expected
+            if buffer_amt in RASTER_BUFFERS:
+                mismatches["raster is_valid_move(buffer %d)" % buffer_amt] += \
+                    raster_border.is_valid_move(x, y, buffer_amt) != expected
+                checks += 1
+            checks += 1
+        for epsilon in EPSILONS:
+            expected = reference_is_on_the_edges(border, x, y, epsilon)
+            mismatches["scanline is_on_the_edges(epsilon %d)" % epsilon] += border.is_on_the_edges(x, y, epsilon) != expected
+            if epsilon == 0:
+                mismatches["raster is_on_the_edges"] += raster_border.is_on_the_edges(x, y) != expected
+                checks += 1
+            checks += 1
+    return checks
+
+def check_capture(old_points, border, keep_point, mismatches):
+    """
+    Checks the invariants of one capture (border.add_poly after a Polygon split): the field stays rectilinear, its
+    area is the area of its points, the claimed region is exactly what left the field, the Qix is never claimed, and
+    the larger part is kept when the Qix is in neither part (ex. on the trail)
+    :param old_points: edge points before the capture
+    :param keep_point: tuple that add_poly was asked to keep (the Qix's position)
+    :param mismatches: Counter of check name -> mismatches (updated)
+    :return: number of checks
+    """
+    points = border.get_edge_points()
+    old_field, field = Polygon(old_points), Polygon(points)
+    claimed = old_field.difference(field)
+    mismatches["capture rectilinear"] += not all(
+        isinstance(x1, int) and isinstance(y1, int) and (x1 == x2 or y1 == y2)
+        for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]))
+    mismatches["capture area"] += abs(border.field_area - Border.get_area(points)) > 1e-6
+    mismatches["capture inside old field"] += field.difference(old_field).area > 1e-6
+    mismatches["capture claimed + kept = old"] += abs(claimed.area + field.area - old_field.area) > 1e-6
+    mismatches["capture keeps the Qix"] += claimed.contains(Point(keep_point))
+    if not field.contains(Point(keep_point)) and not claimed.contains(Point(keep_point)):
+        parts = getattr(claimed, "geoms", [claimed])
+        mismatches["capture keeps the larger part"] += any(part.area > field.area for part in parts)
+    return 6
+
+# =========
+#   GAMES
+# =========
+
+def check_game(seed, ticks, count, mismatches):
+    """
+    Plays one scripted game on a raster border and checks every capture and the board after it
+    :return: (captures, checks)
+    """
+    rng = random.Random(seed)
+    state = GameState(seed=seed)
+    state.border = Border(raster=True, rng=state.rng)
+    script = ScriptedPlayer(seed)
+    border = Border()
+    captures = checks = 0
+    for _ in range(ticks):
+        old_points, version, level = state.border.get_edge_points(), state.border.version, state.level
+        keep_point = (state.qix.x, state.qix.y)
+        state.step(script.get_inputs(state))
+        if state.border.version == version:
+            continue
+        if state.level == level:     # (a level up resets the edges right after the capture)
+            captures += 1
+            checks += check_capture(old_points, state.border, keep_point, mismatches)
+        border.set_edge_points(state.border.get_edge_points())
+        checks += compare_queries(border, state.border, get_query_points(border, count, rng), mismatches)
+        if state.is_over():
+            break
+    return captures, checks
+
+def run(games=10, ticks=20000, count=500, seed=0):
+    """
+    Compares the fast paths with the reference on the benchmark boards and on the boards of scripted games
+    :return: Counter of check name -> mismatches, number of captures, number of checks
+    """
+    mismatches = Counter()
+    rng = random.Random(seed)
+    checks = 0
+    for claimed in STATES.values():
+        border = make_border(claimed)
+        checks += compare_queries(border, make_border(claimed, raster=True), get_query_points(border, count, rng),
+                                  mismatches)
+    captures = 0
+    for game in range(games):
+        game_captures, game_checks = check_game(seed + game, ticks, count, mismatches)
+        captures += game_captures
+        checks += game_checks
+    return mismatches, captures, checks
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checks that the raster, scanline and capture fast paths of Border "
+                                                 "agree with the plain Shapely answers")
+    parser.add_argument("--games", type=int, default=10, help="scripted games to play")
+    parser.add_argument("--ticks", type=int, default=20000, help="maximum ticks per game")
+    parser.add_argument("--count", type=int, default=500, help="random query points per board")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mismatches, captures, checks = run(args.games, args.ticks, args.count, args.seed)
+    print("%d checks on %d captures" % (checks, captures))
+    for name, count in sorted(mismatches.items()):
+        print("    %-40s %8d mismatches" % (name, count))
+    sys.exit(1 if sum(mismatches.values()) > 0 else 0)
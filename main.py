@@ -1,15 +1,31 @@
+import argparse
+import random
 import pygame
-from Border import Border
-from Enemy import Qix, Sparx
+from Game import GameState
 from Player import Player
-from copy import deepcopy
+from Renderer import Renderer
+from Assets import Assets, Sounds
+from Profiler import Profiler
+from Replay import Replay
+
+KEY_ACTIONS = {pygame.K_UP: Player.UP,              # 'UP' - MOVE UP
+               pygame.K_DOWN: Player.DOWN,          # 'DOWN' - MOVE DOWN
+               pygame.K_RIGHT: Player.RIGHT,        # 'RIGHT' - MOVE RIGHT
+               pygame.K_LEFT: Player.LEFT,          # 'LEFT' - MOVE LEFT
+               pygame.K_SPACE: Player.TELEPORT,     # 'SPACE' - TELEPORT TO RANDOM PART OF THE SCREEN
+               pygame.K_q: GameState.QUIT}          # 'Q' - QUIT
+
+FPS = 60                # RENDER CAP (logic runs at GameState.TICK_RATE regardless)
+MAX_FRAME_TIME = 0.25   # MOST GAME TIME CAUGHT UP IN ONE FRAME (ex. after a stall) - SECONDS
+
+pending_inputs = []     # INPUTS READ BUT NOT SIMULATED YET (applied on the next logic tick)
 
 # ============
 #   SCREENS
 # ============
 
-def start_game():
-    draw_screen_image("screen000.png")
+def start_game(renderer):
+    renderer.draw_screen_image("screen000.png")
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             return True, False
@@ -18,40 +34,46 @@ def start_game():
                 return True, True
     return False, True
 
-def run_game_level(level):
-    clock = pygame.time.Clock()
-    screen.fill((0, 0, 0))
-    running = True
-
-    if player.is_dead():       # PLAYER DIED
-        return True, running
-
-    if not player.get_move():  # PLAYER PRESSED QUIT
-        running = False
-
-    player.update_xy(border)   # DISPLAY UPDATES
-    border.draw(screen)
-    player.get_trail().draw(screen, (player.x, player.y))
-    qix.draw(screen, border)
-    if level == 2:             # LEVEL 2 - EXCLUSIVE UPDATES
-        sparc.draw(screen, border)
-        player.draw(screen, player.check_collision(qix, border) or player.check_collision(sparc, border, True))
-    else:                      # LEVEL 1 - EXCLUSIVE UPDATES
-        player.draw(screen, player.check_collision(qix, border))
-
-    if player.is_hit == 300 and not player.is_dead():  # COLLISION SOUND EFFECTS
-        play_sound("sfx_bad.mp3")
-        pygame.time.delay(200)
-
-    player.display_lives(screen, font)
-    border.display_score(screen, font)
-
-    pygame.display.update()
-    clock.tick(10000)
-    return False, running
-
-def end_game_(image_name):
-    draw_screen_image(image_name)
+def run_game_level(state, renderer, lag, replay=None):
+    """
+    Runs as many fixed logic ticks as fit in the elapsed time, then draws one frame
+    :param lag: seconds of real time not yet simulated
+    :param replay: Replay object that logs the inputs of every tick; None to not record
+    :return: game_over, running, seconds of real time still not simulated
+    """
+    if state.player.is_dead():      # PLAYER DIED
+        return True, state.running, 0
+
+    profiler = state.profiler
+    profiler.start_frame()
+    profiler.start("input")
+    pending_inputs.extend(get_inputs())
+    while lag >= GameState.TICK:
+        lag -= GameState.TICK
+        inputs = pending_inputs[:]
+        pending_inputs.clear()
+        if replay is not None:
+            replay.record(state.ticks, inputs)
+        events = state.step(inputs)
+        profiler.start("events")
+        for event in events:
+            if event == GameState.HIT:                  # COLLISION SOUND EFFECTS
+                play_sound("sfx_bad.mp3")
+            elif event == GameState.LEVEL_UP:           # LEVEL UP
+                play_sound("sfx_good.mp3")
+                renderer.draw_screen_image("screen001.png")
+                pygame.time.delay(1000)
+                lag = 0
+        profiler.stop()
+        if state.is_over():
+            break
+
+    renderer.draw(state)
+    profiler.end_frame()
+    return False, state.running, lag
+
+def end_game_(renderer, image_name):
+    renderer.draw_screen_image(image_name)
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             return False
@@ -61,82 +83,103 @@ def end_game_(image_name):
 #   PYGAME HELPERS
 # ===================
 
-def draw_screen_image(image_name):
-    image = pygame.image.load(image_name)
-    image = pygame.transform.scale(image, (800, 800))
-    screen.blit(image, (0, 0))
-    pygame.display.update()
+def get_inputs():
+    """
+    Read user input
+    :return: list of actions (see GameState.step)
+    """
+    inputs = []
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:           # CLICK 'X' - QUIT
+            inputs.append(GameState.QUIT)
+        if event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+            inputs.append(KEY_ACTIONS[event.key])
+        if event.type == pygame.KEYUP:          # NO INPUT - STOP
+            inputs.append(Player.STOP)
+    return inputs
 
 def play_sound(sound_name):
-    pygame.mixer.music.load(sound_name)
-    pygame.mixer.music.set_volume(0.6)
-    pygame.mixer.music.play()
+    Sounds.play(sound_name)     # pre-decoded; non-blocking (see Sounds)
 
-# ===================
-#   INITIALIZATION
-# ===================
+# =============================
+#   MAIN FUNCTION STARTS HERE
+# =============================
 
-pygame.init()
-pygame.mixer.init()
+def main(profile=False, budget=1000 / FPS, profile_output=None, seed=None, record=None):
+    """
+    :param profile: True to time every phase of every game frame (report printed on exit)
+    :param budget: milliseconds a frame may take before the profiler flags it
+    :param profile_output: .csv or .json file to dump the profiler's frames to on exit
+    :param seed: seed of the game's random numbers; None for a random game
+    :param record: file to save a Replay of the game to on exit (see Replay.py)
+    """
+    pygame.init()
+    pygame.mixer.init()
+    Sounds.load_all()
+
+    screen = pygame.display.set_mode((800, 800))
+    font = pygame.font.Font('slkscrb.ttf', 40)
+    Assets.preload(background=True)     # FILL THE IMAGE CACHE WHILE THE START SCREEN IS UP
+    profiler = Profiler(profile, budget / 1000)
+    renderer = Renderer(screen, font, profiler)
+    if seed is None:
+        seed = random.randrange(2**32)
+    state = GameState(profiler, seed)
+    replay = Replay(seed) if record else None
+    clock = pygame.time.Clock()
+    lag = 0
 
-# GLOBAl VARIABLES
-screen = pygame.display.set_mode((800, 800))
-font = pygame.font.Font('slkscrb.ttf', 40)
-player_image = pygame.image.load("icon00.png")
-qix_image = pygame.image.load("icon10.png")
-sparc_image = pygame.image.load("icon20.png")
+    game_start = False
+    running_end = False
+    game_over = False
+    running = True
 
-player = Player(player_image)
-border = Border()
-qix = Qix(qix_image)
-sparc = Sparx(sparc_image)
-level = 1
+    while running:
+        frame_time = min(clock.tick(FPS) / 1000, MAX_FRAME_TIME)     # sleeps to cap the frame rate
 
-game_start = False
-running_end = False
-game_over = False
-running = True
+        # START SCREEN
+        if not game_start:
+            game_start, running = start_game(renderer)
 
-# =============================
-#   MAIN FUNCTION STARTS HERE
-# =============================
+        # GAME SCREEN
+        elif game_start and not game_over:
+            game_over, running, lag = run_game_level(state, renderer, lag + frame_time, replay)
+            if state.won:               # WIN GAME
+                running = False
+                running_end = True
 
-while running:
-    # START SCREEN
-    if not game_start:
-        game_start, running = start_game()
+        # GAME OVER SCREEN
+        elif game_over:
+            running_end = True
+            running = False
 
-    # GAME SCREEN
-    elif game_start and not game_over:
+    if replay is not None:  # SAVE THE REPLAY
+        replay.finish(state)
+        replay.save(record)
 
-        if level == 2 and int(border.get_score()) > 75:     # WIN GAME
-            running = False
-            running_end = True
+    if profiler.enabled:    # PROFILER REPORT
+        profiler.print_report()
+        if profile_output:
+            profiler.dump(profile_output)
 
-        elif int(border.get_score()) > 75 and level != 2:   # LEVEL UP
-            play_sound("sfx_good.mp3")
-            level = 2
-            draw_screen_image("screen001.png")
-            pygame.time.delay(1000)
-            player.x, player.y = 400, 700                    # Reset
-            border.edge_points = deepcopy(border.init_grid)  # Reset
-            game_over, running = run_game_level(level)
-
-        else:
-            game_over, running = run_game_level(level)
-
-    # GAME OVER SCREEN
-    elif game_over:
-        running_end = True
-        running = False
-
-if not game_over:  # DISPLAY WIN SCREEN
-    play_sound("sfx_win.mp3")
-    while running_end:
-        running_end = end_game_("screen002.png")
-
-else:  # DISPLAY LOSE SCREEN
-    play_sound("sfx_bad.mp3")
-    while running_end:
-        running_end = end_game_("screen003.png")
+    if not game_over:  # DISPLAY WIN SCREEN
+        play_sound("sfx_win.mp3")
+        while running_end:
+            running_end = end_game_(renderer, "screen002.png")
+            clock.tick(FPS)
 
+    else:  # DISPLAY LOSE SCREEN
+        play_sound("sfx_bad.mp3")
+        while running_end:
+            running_end = end_game_(renderer, "screen003.png")
+            clock.tick(FPS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Qix")
+    parser.add_argument("--profile", action="store_true", help="time each phase of every frame; report on exit")
+    parser.add_argument("--budget", type=float, default=1000 / FPS, help="frame budget in milliseconds")
+    parser.add_argument("--profile-output", help="dump the profiled frames to this .csv or .json file")
+    parser.add_argument("--seed", type=int, help="seed of the game's random numbers")
+    parser.add_argument("--record", help="save a replay of the game to this file (play it with Replay.py)")
+    args = parser.parse_args()
+    main(args.profile, args.budget, args.profile_output, args.seed, args.record)